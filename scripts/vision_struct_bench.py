@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the VisionStruct agent (vision_struct_agent.py).
+
+codec: compares the original response path (stdlib json.loads, pydantic
+validation of VisionJobResult, model_dump, HttpVisionResponse re-validation,
+jsonable_encoder + json.dumps) with the current fast path (json_loads,
+model_construct, json_dumps) on a synthetic "capture every pixel" payload.
+
+validate: the compiled prompt-schema validator against pydantic models built
+from the same example schema, both prebuilt and rebuilt per request.
+
+import: cold-start cost of importing the agent core, the Swarm runtime and
+the HTTP layer, each measured in fresh interpreters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def synthetic_output(objects: int) -> str:
+    """Model-shaped JSON text with ``objects`` fully populated entries."""
+    payload: Dict[str, Any] = {
+        "meta": {"image_quality": "High", "image_type": "Photo", "resolution_estimation": "4032x3024"},
+        "global_context": {
+            "scene_description": "A cluttered workbench under mixed light. " * 8,
+            "time_of_day": "Late afternoon",
+            "weather_atmosphere": "Serene",
+            "lighting": {"source": "Mixed", "direction": "Side-lit", "quality": "Soft", "color_temp": "Warm"},
+        },
+        "color_palette": {
+            "dominant_hex_estimates": ["#3A2F28", "#D9C7A8", "#8C6E4F"],
+            "accent_colors": ["Teal", "Rust"],
+            "contrast_level": "Medium",
+        },
+        "composition": {
+            "camera_angle": "High-angle",
+            "framing": "Wide-shot",
+            "depth_of_field": "Deep",
+            "focal_point": "Soldering iron",
+        },
+        "objects": [
+            {
+                "id": f"obj_{i:03d}",
+                "label": f"Component {i}",
+                "category": "Tool",
+                "location": "Center",
+                "prominence": "Foreground",
+                "visual_attributes": {
+                    "color": "Matte black with worn silver edges",
+                    "texture": "Smooth",
+                    "material": "Plastic",
+                    "state": "Used",
+                    "dimensions_relative": "Small relative to frame",
+                },
+                "micro_details": [f"Scratch {j} along the casing near the seam" for j in range(12)],
+                "pose_or_orientation": "Tilted",
+                "text_content": None,
+            }
+            for i in range(objects)
+        ],
+        "text_ocr": {"present": False, "content": []},
+        "semantic_relationships": [f"Component {i} rests beside Component {i + 1}" for i in range(objects)],
+    }
+    return json.dumps(payload, indent=2)
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_codec(objects: int, repeat: int) -> Dict[str, Any]:
+    from fastapi.encoders import jsonable_encoder
+
+    import vision_struct_agent as vsa
+
+    raw_output = synthetic_output(objects)
+    job = vsa.VisionJobRequest(image_b64="AA==", project="BENCH", context_tags=["bench"])
+
+    def original_path() -> bytes:
+        parsed = json.loads(raw_output)
+        result = vsa.VisionJobResult(
+            job_id=job.job_id,
+            success=True,
+            raw_json=parsed,
+            project=job.project,
+            context_tags=job.context_tags,
+        )
+        dumped = result.model_dump()
+        response = vsa.HttpVisionResponse(job_id=dumped["job_id"], data=dumped["raw_json"])
+        validated = vsa.HttpVisionResponse.model_validate(response.model_dump())
+        return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode("utf-8")
+
+    def fast_path() -> bytes:
+        result = vsa.VisionStructAgent._build_result(job, vsa.json_loads(raw_output))
+        return vsa.VisionJSONResponse({"job_id": result.job_id, "data": result.raw_json}).body
+
+    assert json.loads(original_path()) == json.loads(fast_path())
+
+    report: Dict[str, Any] = {"codec": vsa.JSON_CODEC, "payload_bytes": len(raw_output), "objects": objects}
+    for name, fn in (("original", original_path), ("fast", fast_path)):
+        samples = _time(fn, repeat)
+        report[name] = {
+            "median_ms": round(statistics.median(samples) * 1000, 3),
+            "min_ms": round(min(samples) * 1000, 3),
+        }
+    report["speedup"] = round(report["original"]["median_ms"] / report["fast"]["median_ms"], 2)
+    return report
+
+
+def _pydantic_model(name: str, example: Any) -> Any:
+    """A pydantic type equivalent to the compiled validator's rules for ``example``."""
+    from typing import List as ListType, Optional as OptionalType
+
+    from pydantic import create_model
+
+    if isinstance(example, dict):
+        fields = {}
+        for key, value in example.items():
+            field_type = _pydantic_model(f"{name}_{key}", value)
+            fields[key] = (OptionalType[field_type], ...)
+        return create_model(name, **fields)
+    if isinstance(example, list):
+        if not example:
+            return list
+        item_type = _pydantic_model(f"{name}_item", example[0])
+        return ListType[item_type]
+    return type(example)
+
+
+def bench_validate(objects: int, repeat: int) -> Dict[str, Any]:
+    import vision_struct as vs
+
+    document = json.loads(synthetic_output(objects))
+    compile_started = time.perf_counter()
+    validator = vs.VisionSchemaValidator.from_prompt()
+    compile_s = time.perf_counter() - compile_started
+    prebuilt = _pydantic_model("VisionOutput", validator.schema)
+    assert validator.validate(document) == []
+
+    def rebuilt() -> Any:
+        return _pydantic_model("VisionOutput", validator.schema).model_validate(document)
+
+    report: Dict[str, Any] = {"objects": objects, "compile_ms": round(compile_s * 1000, 3)}
+    paths = (
+        ("compiled", lambda: validator.validate(document)),
+        ("pydantic_prebuilt", lambda: prebuilt.model_validate(document)),
+        ("pydantic_rebuilt", rebuilt),
+    )
+    for name, fn in paths:
+        samples = _time(fn, repeat)
+        report[name] = {
+            "median_ms": round(statistics.median(samples) * 1000, 3),
+            "min_ms": round(min(samples) * 1000, 3),
+        }
+    report["speedup_vs_rebuilt"] = round(report["pydantic_rebuilt"]["median_ms"] / report["compiled"]["median_ms"], 2)
+    return report
+
+
+# Statement run in a fresh interpreter per target; the HTTP target is what every import cost before the split.
+IMPORT_TARGETS = {
+    "schemas": "import vision_struct.schemas",
+    "agent": "import vision_struct.agent",
+    "swarm": "import vision_struct.swarm, vision_struct.agent",
+    "compat": "import vision_struct_agent; vision_struct_agent.VisionStructAgent",
+    "http": "import vision_struct.http",
+}
+HEAVY_MODULES = ("fastapi", "uvicorn", "starlette", "PIL")
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{"import_s": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def bench_import(targets: List[str], repeat: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "repeat": repeat, "targets": {}}
+    for name in targets:
+        code = _IMPORT_PROBE.format(statement=IMPORT_TARGETS[name], heavy=HEAVY_MODULES)
+        imports: List[float] = []
+        processes: List[float] = []
+        heavy: List[str] = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            processes.append(time.perf_counter() - started)
+            sample = json.loads(completed.stdout.strip().splitlines()[-1])
+            imports.append(sample["import_s"])
+            heavy = sample["heavy"]
+        report["targets"][name] = {
+            "import_median_ms": round(statistics.median(imports) * 1000, 1),
+            "process_median_ms": round(statistics.median(processes) * 1000, 1),
+            "heavy_modules": heavy,
+        }
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="VisionStruct micro-benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    codec = sub.add_parser("codec", help="Response parse/serialize path: original vs fast codec.")
+    codec.add_argument("--objects", type=int, default=400, help="Objects in the synthetic model output.")
+    codec.add_argument("--repeat", type=int, default=50, help="Timed iterations per path.")
+
+    validate = sub.add_parser("validate", help="Compiled schema validator vs pydantic models.")
+    validate.add_argument("--objects", type=int, default=400, help="Objects in the synthetic model output.")
+    validate.add_argument("--repeat", type=int, default=50, help="Timed iterations per path.")
+
+    imports = sub.add_parser("import", help="Cold-start import time of the core, Swarm and HTTP layers.")
+    imports.add_argument(
+        "--targets",
+        default=",".join(IMPORT_TARGETS),
+        help=f"Comma-separated targets: {', '.join(IMPORT_TARGETS)}.",
+    )
+    imports.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per target.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "codec":
+        report = bench_codec(objects=args.objects, repeat=args.repeat)
+    elif args.command == "validate":
+        report = bench_validate(objects=args.objects, repeat=args.repeat)
+    else:
+        targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+        unknown = set(targets) - set(IMPORT_TARGETS)
+        if unknown:
+            raise SystemExit(f"Unknown targets: {', '.join(sorted(unknown))}")
+        report = bench_import(targets, repeat=args.repeat)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Offline bulk Vision-to-JSON extraction over a directory of images.
+
+Walks a directory, runs every image through VisionStructAgent with bounded
+concurrency and appends one JSON line per image to a JSONL file, or to
+numbered shards in a directory with --shard-size. The model client and
+agent options come from the same VISION_* environment as the API
+(VISION_MODEL_CLIENT_FACTORY, rate limits, retries, schema validation).
+
+A checkpoint file records the SHA-256 of every image with a result, so an
+interrupted run resumes where it stopped. Images already processed (even
+under another path) are skipped, and unchanged files are recognised by
+size and mtime without being re-read. Failed images are not checkpointed
+and are retried on the next run. Progress and throughput are printed to
+stderr while the run is going.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+
+
+def _iter_images(root: Path, suffixes: Tuple[str, ...]) -> List[Path]:
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(suffixes):
+                found.append(Path(dirpath) / name)
+    return found
+
+
+def _open_append(path: Path) -> BinaryIO:
+    """Open for appending, first dropping a partial last line left by a crash."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = path.open("a+b")
+    size = handle.seek(0, os.SEEK_END)
+    if size:
+        tail_start = max(0, size - 64 * 1024)
+        handle.seek(tail_start)
+        tail = handle.read()
+        cut = tail.rfind(b"\n")
+        if cut >= 0 or tail_start == 0:
+            handle.truncate(tail_start + cut + 1)
+        else:
+            # Partial line longer than the tail window: terminate it so the next record starts clean.
+            handle.write(b"\n")
+    handle.seek(0, os.SEEK_END)
+    return handle
+
+
+class Checkpoint:
+    """Append-only record of finished images: ``sha256 size mtime_ns relpath`` per line."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hashes: Set[str] = set()
+        self.stats: Dict[str, Tuple[int, int, str]] = {}
+        if path.exists():
+            with path.open("rb") as fh:
+                for line in fh:
+                    parts = line.rstrip(b"\n").decode("utf-8", "replace").split("\t", 3)
+                    if len(parts) != 4 or len(parts[0]) != 64 or not line.endswith(b"\n"):
+                        continue
+                    digest, size, mtime_ns, relpath = parts
+                    self.hashes.add(digest)
+                    self.stats[relpath] = (int(size), int(mtime_ns), digest)
+        self._handle = _open_append(path)
+
+    def unchanged(self, relpath: str, stat: os.stat_result) -> bool:
+        known = self.stats.get(relpath)
+        return known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns)
+
+    def add(self, digest: str, relpath: str, stat: os.stat_result) -> None:
+        self.hashes.add(digest)
+        self._handle.write(f"{digest}\t{stat.st_size}\t{stat.st_mtime_ns}\t{relpath}\n".encode("utf-8"))
+        self._handle.flush()
+
+    def sync(self) -> None:
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self.sync()
+        self._handle.close()
+
+
+class ResultWriter:
+    """JSONL output, either one file or numbered ``part-NNNNN.jsonl`` shards in a directory."""
+
+    def __init__(self, output: Path, shard_size: Optional[int]):
+        self.output = output
+        self.shard_size = shard_size
+        self.written = 0
+        self._in_shard = 0
+        self._shard = 0
+        if shard_size:
+            output.mkdir(parents=True, exist_ok=True)
+            existing = sorted(output.glob("part-*.jsonl"))
+            # A resumed run starts a fresh shard rather than appending to a possibly partial one.
+            self._shard = int(existing[-1].stem.split("-")[1]) + 1 if existing else 0
+            self._handle = _open_append(self._shard_path())
+        else:
+            self._handle = _open_append(output)
+
+    def _shard_path(self) -> Path:
+        return self.output / f"part-{self._shard:05d}.jsonl"
+
+    def write(self, line: bytes) -> None:
+        if self.shard_size and self._in_shard >= self.shard_size:
+            self._handle.close()
+            self._shard += 1
+            self._in_shard = 0
+            self._handle = _open_append(self._shard_path())
+        self._handle.write(line + b"\n")
+        self._handle.flush()
+        self._in_shard += 1
+        self.written += 1
+
+    def sync(self) -> None:
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self.sync()
+        self._handle.close()
+
+
+class Progress:
+    def __init__(self, total: int, interval: float):
+        self.total = total
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+        self._last_report = self.started
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        processed = self.ok + self.failed
+        remaining = self.total - processed - self.skipped
+        rate = processed / elapsed if elapsed else 0.0
+        return {
+            "total": self.total,
+            "ok": self.ok,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 1),
+            "images_per_s": round(rate, 2),
+            "eta_s": round(remaining / rate, 1) if rate else None,
+        }
+
+    def maybe_report(self, force: bool = False) -> bool:
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return False
+        self._last_report = now
+        snap = self.snapshot()
+        done = snap["ok"] + snap["failed"] + snap["skipped"]
+        print(
+            f"[bulk] {done}/{snap['total']} ({snap['ok']} ok, {snap['failed']} failed, {snap['skipped']} skipped) "
+            f"{snap['images_per_s']} img/s, elapsed {snap['elapsed_s']}s"
+            + (f", eta {snap['eta_s']}s" if snap["eta_s"] is not None else ""),
+            file=sys.stderr,
+            flush=True,
+        )
+        return True
+
+
+async def run_bulk(args: argparse.Namespace) -> Dict[str, Any]:
+    from vision_struct import json_dumps
+    from vision_struct.schemas import VisionJobRequest, VisionJobResult
+    from vision_struct.settings import VisionServiceSettings, build_agent
+
+    root = Path(args.input).resolve()
+    suffixes = tuple(s if s.startswith(".") else f".{s}" for s in args.extensions.lower().split(","))
+    images = _iter_images(root, suffixes)
+    output = Path(args.output)
+    checkpoint = Checkpoint(Path(args.checkpoint) if args.checkpoint else output.with_name(output.name + ".checkpoint"))
+    writer = ResultWriter(output, args.shard_size)
+    progress = Progress(len(images), args.progress_seconds)
+
+    settings = VisionServiceSettings.from_env()
+    if args.model_client_factory:
+        settings.model_client_factory = args.model_client_factory
+    agent = build_agent(settings)
+    tags = [t for t in (args.tags or "").split(",") if t] or None
+    in_progress: Set[str] = set()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+
+    async def process(path: Path) -> None:
+        relpath = str(path)
+        try:
+            relpath = path.relative_to(root).as_posix()
+            stat = path.stat()
+            if checkpoint.unchanged(relpath, stat):
+                progress.skipped += 1
+                return
+            image_bytes = await asyncio.to_thread(path.read_bytes)
+        except (OSError, ValueError) as exc:
+            # Dangling symlinks, permission errors and files removed mid-walk fail this image only.
+            writer.write(json_dumps({"path": relpath, "success": False, "error": str(exc)}))
+            progress.failed += 1
+            return
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        if digest in checkpoint.hashes or digest in in_progress:
+            progress.skipped += 1
+            return
+        in_progress.add(digest)
+        record: Dict[str, Any] = {"path": relpath, "sha256": digest}
+        try:
+            result: VisionJobResult = await agent.arun_job(
+                VisionJobRequest(image_bytes=image_bytes, project=args.project, context_tags=tags),
+            )
+        except Exception as exc:  # noqa: BLE001
+            record.update({"success": False, "error": str(exc)})
+            writer.write(json_dumps(record))
+            progress.failed += 1
+        else:
+            record.update(
+                {
+                    "job_id": result.job_id,
+                    "success": True,
+                    "data": result.raw_json,
+                    "repairs": result.repairs,
+                    "schema_issues": result.schema_issues,
+                },
+            )
+            writer.write(json_dumps(record))
+            # Checkpoint only after the result line is flushed; a crash in between re-runs the image.
+            checkpoint.add(digest, relpath, stat)
+            progress.ok += 1
+        finally:
+            in_progress.discard(digest)
+
+    async def worker() -> None:
+        while (path := await queue.get()) is not None:
+            await process(path)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(args.concurrency)]
+    try:
+        for path in images:
+            await queue.put(path)
+            if progress.maybe_report():
+                writer.sync()
+                checkpoint.sync()
+        for _ in workers:
+            await queue.put(None)
+        while not all(w.done() for w in workers):
+            await asyncio.wait(workers, timeout=args.progress_seconds)
+            progress.maybe_report()
+        for w in workers:
+            w.result()
+    finally:
+        for w in workers:
+            w.cancel()
+        writer.close()
+        checkpoint.close()
+        agent.close()
+    progress.maybe_report(force=True)
+    return progress.snapshot()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run Vision-to-JSON over every image in a directory.")
+    parser.add_argument("input", help="Directory to walk (recursively).")
+    parser.add_argument("output", help="JSONL output file, or a directory of shards with --shard-size.")
+    parser.add_argument("--shard-size", type=int, default=None, help="Records per part-NNNNN.jsonl shard.")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <output>.checkpoint).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Images processed at once.")
+    parser.add_argument("--extensions", default=",".join(IMAGE_SUFFIXES), help="Comma-separated image suffixes.")
+    parser.add_argument("--project", default=None, help="Project label attached to every job.")
+    parser.add_argument("--tags", default=None, help="Comma-separated context tags attached to every job.")
+    parser.add_argument(
+        "--model-client-factory",
+        default=None,
+        help="'module:callable' building the model client (overrides VISION_MODEL_CLIENT_FACTORY).",
+    )
+    parser.add_argument("--progress-seconds", type=float, default=5.0, help="Seconds between progress lines.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1")
+    summary = asyncio.run(run_bulk(args))
+    print(
+        f"{summary['ok']} ok, {summary['failed']} failed, {summary['skipped']} skipped "
+        f"in {summary['elapsed_s']}s ({summary['images_per_s']} img/s)",
+    )
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
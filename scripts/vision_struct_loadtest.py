@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Load generator for the VisionStruct agent API (vision_struct_agent.py).
+
+Starts the FastAPI app (optionally with several workers) in a child process
+with a fake MultiModalModelClient (tunable latency and output size), drives the JSON, upload and batch
+endpoints at a target request rate, and reports throughput and p50/p95/p99
+latency. Results can be written as JSON so runs can be compared between
+commits. Pass --url to load an already-running server instead.
+
+Requires httpx (pip install httpx).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import datetime as dt
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from vision_struct_bench import synthetic_output  # noqa: E402
+
+PATHS = ("json", "upload", "batch")
+
+
+def fake_model_client() -> Any:
+    """Model client factory for the server under test (VISION_MODEL_CLIENT_FACTORY).
+
+    Each worker process builds its own client from the LOADTEST_* variables set by _serve.
+    """
+    import vision_struct_agent as vsa
+
+    latency_ms = float(os.environ.get("LOADTEST_LATENCY_MS", "200"))
+    jitter_ms = float(os.environ.get("LOADTEST_JITTER_MS", "50"))
+    output = synthetic_output(int(os.environ.get("LOADTEST_OUTPUT_OBJECTS", "50")))
+
+    class FakeModelClient(vsa.MultiModalModelClient):
+        """Sleeps for the configured latency, then returns a fixed JSON payload."""
+
+        def _delay(self) -> float:
+            return max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000
+
+        def call_model(self, image_bytes: bytes, system_prompt: str, timeout: Optional[float] = None) -> str:
+            time.sleep(self._delay())
+            return output
+
+        async def acall_model(self, image_bytes: bytes, system_prompt: str, timeout: Optional[float] = None) -> str:
+            await asyncio.sleep(self._delay())
+            return output
+
+    return FakeModelClient(model_name="loadtest-fake")
+
+
+def _serve(port: int, args: argparse.Namespace) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        {
+            "VISION_MODEL_CLIENT_FACTORY": "vision_struct_loadtest:fake_model_client",
+            "LOADTEST_LATENCY_MS": str(args.latency_ms),
+            "LOADTEST_JITTER_MS": str(args.jitter_ms),
+            "LOADTEST_OUTPUT_OBJECTS": str(args.output_objects),
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), str(ROOT / "scripts"), env.get("PYTHONPATH")])),
+        }
+    )
+    command = [
+        sys.executable,
+        str(ROOT / "vision_struct_agent.py"),
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(args.workers),
+        "--backlog", "4096",
+    ]
+    return subprocess.Popen(command, env=env, cwd=ROOT)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return round(ordered[index] * 1000, 3)
+
+
+def _image(counter: int, image_bytes: int) -> bytes:
+    # Unique per request so the result cache and coalescing do not short-circuit the model.
+    return counter.to_bytes(8, "big") + os.urandom(max(0, image_bytes - 8))
+
+
+async def _one_request(client: Any, path: str, counter: int, args: argparse.Namespace) -> int:
+    if path == "json":
+        body = {"image_b64": base64.b64encode(_image(counter, args.image_bytes)).decode("ascii"), "project": "LOADTEST"}
+        response = await client.post("/vision-to-json", json=body)
+    elif path == "upload":
+        files = {"file": ("image.bin", _image(counter, args.image_bytes), "application/octet-stream")}
+        response = await client.post("/vision-to-json/upload", files=files, params={"project": "LOADTEST"})
+    else:
+        items = [
+            {"image_b64": base64.b64encode(_image(counter * args.batch_size + i, args.image_bytes)).decode("ascii")}
+            for i in range(args.batch_size)
+        ]
+        response = await client.post("/vision-to-json/batch", json={"items": items})
+    return response.status_code
+
+
+async def _drive(base_url: str, path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    total = int(args.rps * args.duration)
+    outstanding = asyncio.Semaphore(args.max_outstanding)
+    limits = httpx.Limits(max_connections=args.max_outstanding, max_keepalive_connections=args.max_outstanding)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+
+        async def fire(counter: int, scheduled: float) -> None:
+            # Latency runs from the scheduled send time, so waiting for an outstanding slot (or a
+            # late event loop) counts against the server instead of being hidden (coordinated omission).
+            async with outstanding:
+                try:
+                    status = str(await _one_request(client, path, counter, args))
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                latencies.append(time.perf_counter() - scheduled)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        # Open-loop schedule: request i starts at i / rps regardless of earlier responses.
+        started = time.perf_counter()
+        tasks = []
+        for counter in range(total):
+            scheduled = started + counter / args.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(fire(counter, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    ok = statuses.get("200", 0)
+    images_per_request = args.batch_size if path == "batch" else 1
+    return {
+        "requests": total,
+        "ok": ok,
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "images_per_s": round(ok * images_per_request / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": _percentile(latencies, 100),
+        },
+    }
+
+
+def _wait_ready(base_url: str, timeout: float) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/metrics", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the VisionStruct agent API against a fake model client.")
+    parser.add_argument("--paths", default="json,upload,batch", help=f"Comma-separated endpoints to drive: {', '.join(PATHS)}.")
+    parser.add_argument("--rps", type=float, default=50.0, help="Target requests per second per path.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to drive each path.")
+    parser.add_argument("--max-outstanding", type=int, default=512, help="Cap on concurrent in-flight requests.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--image-bytes", type=int, default=64 * 1024, help="Size of each synthetic image.")
+    parser.add_argument("--batch-size", type=int, default=16, help="Images per batch request.")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean fake model latency.")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Std-dev of fake model latency.")
+    parser.add_argument("--output-objects", type=int, default=50, help="Objects in the fake model output (controls size).")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the server under test.")
+    parser.add_argument("--url", default=None, help="Target an already-running server instead of starting one.")
+    parser.add_argument("--results", default=None, help="Write machine-readable results JSON to this path.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    unknown = set(paths) - set(PATHS)
+    if unknown:
+        raise SystemExit(f"Unknown paths: {', '.join(sorted(unknown))}")
+
+    server: Optional[subprocess.Popen] = None
+    base_url = args.url
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = _serve(port, args)
+    try:
+        _wait_ready(base_url, timeout=30.0)
+        report: Dict[str, Any] = {
+            "commit": _git_commit(),
+            "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "config": {k: v for k, v in vars(args).items() if k != "results"},
+            "paths": {},
+        }
+        for path in paths:
+            result = asyncio.run(_drive(base_url, path, args))
+            report["paths"][path] = result
+            latency = result["latency_ms"]
+            print(
+                f"{path:>6}: {result['ok']}/{result['requests']} ok, {result['throughput_rps']} req/s, "
+                f"{result['images_per_s']} img/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                f"p99 {latency['p99']} ms",
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    if args.results:
+        Path(args.results).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Results written to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
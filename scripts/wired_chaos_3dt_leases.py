@@ -0,0 +1,197 @@
+"""Expiring claim leases for Wired Chaos 3DT job versions.
+
+A worker owns a job version while ``_LEASES/<job_id>@<version>`` exists and
+names it. Leases are created by writing a private temp file and hard-linking
+it into place, which either succeeds or fails with FileExistsError
+atomically (including on NFS, where O_EXCL historically was not), so two
+workers can never hold the same version. Active leases live in one
+directory, so reaping costs O(running jobs) rather than O(history).
+
+Every other change to a lease (heartbeat renewals, release, reaping) runs
+under an ``fcntl`` lock on ``_LEASES/.lock``, so checking the owner and
+acting on it cannot interleave with another worker, thread or job process.
+Renewals replace the file atomically, so the lease path never disappears
+while its holder is alive. ``held`` exposes the same lock to holders that
+must write job state only while they still own the lease.
+
+Expiry compares wall-clock time across hosts, so the lease length should
+comfortably exceed both the heartbeat interval and any clock skew.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+BASE_DIR = Path("WIRED_CHAOS_3DT")
+LEASES_DIR = BASE_DIR / "_LEASES"
+LOCK_PATH = LEASES_DIR / ".lock"
+LEASE_SUFFIX = ".lease"
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lease_path(job_id: str, version: str) -> Path:
+    return LEASES_DIR / f"{job_id}@{version}{LEASE_SUFFIX}"
+
+
+def _temp_path() -> Path:
+    return LEASES_DIR / f".tmp.{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex}"
+
+
+def _write_temp(lease: Dict) -> Path:
+    LEASES_DIR.mkdir(parents=True, exist_ok=True)
+    temp_path = _temp_path()
+    with temp_path.open("w", encoding="utf-8") as fh:
+        json.dump(lease, fh, sort_keys=True)
+        fh.flush()
+        os.fsync(fh.fileno())
+    return temp_path
+
+
+@contextlib.contextmanager
+def _locked() -> Iterator[None]:
+    LEASES_DIR.mkdir(parents=True, exist_ok=True)
+    # A fresh open file description per call, so the lock also excludes other threads of this process.
+    with LOCK_PATH.open("a") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def read(job_id: str, version: str) -> Optional[Dict]:
+    try:
+        return json.loads(_lease_path(job_id, version).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def acquire(job_id: str, version: str, owner: str, ttl: float) -> Optional[Dict]:
+    """Atomically create the lease for a version; None when someone else holds it."""
+    now = time.time()
+    lease = {
+        "job_id": job_id,
+        "version": version,
+        "owner": owner,
+        "token": uuid.uuid4().hex,
+        "claimed_at": now,
+        "expires_at": now + ttl,
+    }
+    temp_path = _write_temp(lease)
+    try:
+        os.link(temp_path, _lease_path(job_id, version))
+    except FileExistsError:
+        return None
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return lease
+
+
+def holds(lease: Dict) -> bool:
+    current = read(lease["job_id"], lease["version"])
+    return current is not None and current.get("token") == lease["token"]
+
+
+@contextlib.contextmanager
+def held(lease: Dict) -> Iterator[bool]:
+    """Yield whether ``lease`` is still ours; it can be neither reaped nor released until the block exits."""
+    with _locked():
+        yield holds(lease)
+
+
+def renew(lease: Dict, ttl: float) -> bool:
+    """Extend a held lease; False when it has been reaped or replaced."""
+    updated = dict(lease, expires_at=time.time() + ttl)
+    temp_path = _write_temp(updated)
+    try:
+        with _locked():
+            if not holds(lease):
+                return False
+            os.replace(temp_path, _lease_path(lease["job_id"], lease["version"]))
+    finally:
+        temp_path.unlink(missing_ok=True)
+    lease["expires_at"] = updated["expires_at"]
+    return True
+
+
+def release(lease: Dict) -> None:
+    with _locked():
+        if holds(lease):
+            _lease_path(lease["job_id"], lease["version"]).unlink(missing_ok=True)
+
+
+def active() -> Iterator[Dict]:
+    """Every current lease (unreadable ones are skipped)."""
+    if not LEASES_DIR.exists():
+        return
+    for entry in os.scandir(LEASES_DIR):
+        if entry.name.endswith(LEASE_SUFFIX):
+            try:
+                with open(entry.path, encoding="utf-8") as fh:
+                    yield json.load(fh)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+
+
+def take_expired(lease: Dict, now: Optional[float] = None) -> bool:
+    """Remove an expired lease so its job can be re-queued; True when this caller removed it.
+
+    The expiry is re-read under the lease lock, so a heartbeat that landed
+    since ``lease`` was listed keeps the lease alive, and of several
+    concurrent reapers only one finds it still there.
+    """
+    now = time.time() if now is None else now
+    if lease.get("expires_at", 0) > now:
+        return False
+    with _locked():
+        current = read(lease["job_id"], lease["version"])
+        if current is None or current.get("token") != lease.get("token") or current.get("expires_at", 0) > now:
+            return False
+        _lease_path(lease["job_id"], lease["version"]).unlink(missing_ok=True)
+    return True
+
+
+class Heartbeat:
+    """Background thread renewing every lease registered with it until released."""
+
+    def __init__(self, ttl: float, interval: Optional[float] = None):
+        self.ttl = ttl
+        self.interval = interval if interval is not None else ttl / 3
+        self._leases: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="3dt-heartbeat", daemon=True)
+        self._thread.start()
+
+    def add(self, lease: Dict) -> None:
+        with self._lock:
+            self._leases[lease["token"]] = lease
+
+    def discard(self, lease: Dict) -> None:
+        with self._lock:
+            self._leases.pop(lease["token"], None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                held = list(self._leases.values())
+            for lease in held:
+                if not renew(lease, self.ttl):
+                    # Reaped while we were running it; completion checks ``held`` and backs off.
+                    self.discard(lease)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,139 @@
+"""Append-only transition log behind the Wired Chaos 3DT jobs manifest.
+
+Registrations and status changes append one JSON line to
+``_JOBS_MANIFEST.log`` instead of rewriting all of ``_JOBS_MANIFEST.json``,
+so each transition costs O(1) and holds the log lock only for the append.
+``load`` rolls the snapshot and the log up into the full manifest on demand.
+``compact`` writes that roll-up back to ``_JOBS_MANIFEST.json`` (atomically,
+so readers such as the pipeline workflow's ``jq`` always see a whole file)
+and empties the log; it also runs on its own once the log grows past
+``COMPACT_BYTES``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator
+
+BASE_DIR = Path("WIRED_CHAOS_3DT")
+INTAKE_DIR = BASE_DIR / "INTAKE"
+MANIFEST_PATH = BASE_DIR / "_JOBS_MANIFEST.json"
+LOG_PATH = BASE_DIR / "_JOBS_MANIFEST.log"
+
+COMPACT_BYTES = 4 << 20
+
+
+@contextlib.contextmanager
+def _locked_log() -> Iterator[BinaryIO]:
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with LOG_PATH.open("a+b") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield fh
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _load_snapshot() -> Dict:
+    try:
+        with MANIFEST_PATH.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        # Preserve forward progress even if the previous file was malformed.
+        return {}
+
+
+def _apply(manifest: Dict, event: Dict) -> None:
+    jobs = manifest.setdefault("jobs", {})
+    job_id, version = event["job_id"], event["version"]
+    if event["op"] == "register":
+        manifest.setdefault("intake_root", str(INTAKE_DIR))
+        job_record = jobs.setdefault(job_id, {})
+        versions = job_record.setdefault("versions", [])
+        # Replays are idempotent: a crash between snapshot and truncate re-applies the log.
+        if not any(entry.get("version") == version for entry in versions):
+            versions.append(event["entry"])
+        job_record.update(
+            {
+                "job_id": job_id,
+                "intake_path": event["intake_path"],
+                "owned_by": "Wired Chaos",
+                "last_version": version,
+            }
+        )
+    elif event["op"] == "update":
+        for entry in jobs.get(job_id, {}).get("versions", []):
+            if entry.get("version") == version:
+                entry.update(event["fields"])
+                break
+
+
+def _replay(fh: BinaryIO, manifest: Dict) -> Dict:
+    fh.seek(0)
+    for line in fh:
+        if not line.endswith(b"\n"):
+            break
+        try:
+            _apply(manifest, json.loads(line))
+        except (json.JSONDecodeError, KeyError, TypeError):
+            # A torn line from a crashed writer; later lines are still valid.
+            continue
+    return manifest
+
+
+def _append(event: Dict[str, Any]) -> None:
+    line = json.dumps(event, sort_keys=True, separators=(",", ":")).encode("utf-8") + b"\n"
+    with _locked_log() as fh:
+        size = fh.seek(0, os.SEEK_END)
+        if size:
+            fh.seek(size - 1)
+            if fh.read(1) != b"\n":
+                # Terminate a torn line so this event is not glued onto it.
+                line = b"\n" + line
+        fh.write(line)
+        fh.flush()
+        os.fsync(fh.fileno())
+        if size + len(line) >= COMPACT_BYTES:
+            _compact_locked(fh)
+
+
+def record_registration(job_id: str, version: str, intake_path: str, entry: Dict[str, Any]) -> None:
+    """Log a newly registered job version (appended to the job's ``versions``)."""
+    _append({"op": "register", "job_id": job_id, "version": version, "intake_path": intake_path, "entry": entry})
+
+
+def record_update(job_id: str, version: str, fields: Dict[str, Any]) -> None:
+    """Log field changes for an existing job version (status, timestamps, errors)."""
+    _append({"op": "update", "job_id": job_id, "version": version, "fields": fields})
+
+
+def load() -> Dict:
+    """The rolled-up manifest: the last compacted snapshot with the log applied."""
+    with _locked_log() as fh:
+        return _replay(fh, _load_snapshot())
+
+
+def _compact_locked(fh: BinaryIO) -> None:
+    manifest = _replay(fh, _load_snapshot())
+    temp_path = MANIFEST_PATH.parent / f".{MANIFEST_PATH.name}.tmp.{os.getpid()}"
+    with temp_path.open("w", encoding="utf-8") as out:
+        json.dump(manifest, out, indent=2, sort_keys=True)
+        out.write("\n")
+        out.flush()
+        os.fsync(out.fileno())
+    temp_path.replace(MANIFEST_PATH)
+    fh.truncate(0)
+    fh.flush()
+    os.fsync(fh.fileno())
+
+
+def compact() -> None:
+    """Fold the log into ``_JOBS_MANIFEST.json`` and empty it."""
+    with _locked_log() as fh:
+        _compact_locked(fh)
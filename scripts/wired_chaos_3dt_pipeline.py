@@ -12,32 +12,23 @@ import argparse
 import datetime as dt
 import json
 import re
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import wired_chaos_3dt_manifest as manifest_log  # noqa: E402
+import wired_chaos_3dt_queue as ready_queue  # noqa: E402
+
 BASE_DIR = Path("WIRED_CHAOS_3DT")
 INTAKE_DIR = BASE_DIR / "INTAKE"
 JOBS_DIR = BASE_DIR / "JOBS"
-MANIFEST_PATH = BASE_DIR / "_JOBS_MANIFEST.json"
 STATUS_PENDING = "pending"
 
 
-def _load_manifest() -> Dict:
-    if MANIFEST_PATH.exists():
-        with MANIFEST_PATH.open("r", encoding="utf-8") as fh:
-            try:
-                return json.load(fh)
-            except json.JSONDecodeError:
-                # Preserve forward progress even if previous file was malformed.
-                return {}
-    return {}
-
-
-def _save_manifest(manifest: Dict) -> None:
-    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with MANIFEST_PATH.open("w", encoding="utf-8") as fh:
-        json.dump(manifest, fh, indent=2, sort_keys=True)
-        fh.write("\n")
+def _utc_timestamp() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def _next_version(existing: List[str], requested: Optional[str]) -> str:
@@ -90,13 +81,6 @@ def _prepare_job_dirs(job_id: str, version: str) -> Path:
 
 
 def _update_manifest(job_id: str, version: str, consumer: str, timestamp: str, notes: str, status: str) -> None:
-def _update_manifest(job_id: str, version: str, consumer: str, timestamp: str, notes: str) -> None:
-    manifest = _load_manifest()
-    manifest.setdefault("intake_root", str(INTAKE_DIR))
-    manifest.setdefault("jobs", {})
-
-    job_record = manifest["jobs"].get(job_id, {})
-    versions = job_record.get("versions", [])
     version_entry = {
         "version": version,
         "timestamp": timestamp,
@@ -105,25 +89,9 @@ def _update_manifest(job_id: str, version: str, consumer: str, timestamp: str, n
         "notes": notes,
         "owned_by": "Wired Chaos",
         "rendering": STATUS_PENDING,
-        "status": "placeholder",
-        "notes": notes,
-        "owned_by": "Wired Chaos",
-        "rendering": "pending",
         "intake_mode": "job",
     }
-    versions.append(version_entry)
-
-    job_record.update(
-        {
-            "job_id": job_id,
-            "intake_path": str(INTAKE_DIR / job_id),
-            "owned_by": "Wired Chaos",
-            "last_version": version,
-            "versions": versions,
-        }
-    )
-    manifest["jobs"][job_id] = job_record
-    _save_manifest(manifest)
+    manifest_log.record_registration(job_id, version, str(INTAKE_DIR / job_id), version_entry)
 
 
 def _write_version_metadata(version_dir: Path, metadata: Dict) -> None:
@@ -163,31 +131,16 @@ def register_job(intake_id: str, consumer: str, requested_version: Optional[str]
 
     existing_versions: List[str] = []
     versions_dir = JOBS_DIR / safe_intake_id / "versions"
-    _ensure_base_dirs()
-    intake_path = INTAKE_DIR / intake_id
-    intake_path.mkdir(parents=True, exist_ok=True)
-
-    existing_versions: List[str] = []
-    versions_dir = JOBS_DIR / intake_id / "versions"
     if versions_dir.exists():
         existing_versions = [p.name for p in versions_dir.iterdir() if p.is_dir()]
 
-    version = _next_version(existing_versions, requested_version)
-    timestamp = dt.datetime.now(dt.UTC).isoformat(timespec="seconds") + "Z"
     version = _validate_segment(_next_version(existing_versions, safe_requested_version), "version")
-    timestamp = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    timestamp = _utc_timestamp()
 
     version_dir = _prepare_job_dirs(safe_intake_id, version)
     metadata = {
         "job_id": safe_intake_id,
         "consumer": normalized_consumer,
-    timestamp = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
-
-    version_dir = _prepare_job_dirs(intake_id, version)
-    metadata = {
-        "job_id": intake_id,
-        "consumer": normalized_consumer,
-        "consumer": consumer,
         "version": version,
         "timestamp": timestamp,
         "intake_path": str(intake_path),
@@ -198,17 +151,9 @@ def register_job(intake_id: str, consumer: str, requested_version: Optional[str]
         "notes": notes,
     }
     _write_version_metadata(version_dir, metadata)
-    _update_manifest(intake_id, version, normalized_consumer, timestamp, notes, status=STATUS_PENDING)
-        "rendering": "pending",
-        "status": "queued",
-        "notes": notes,
-    }
-    _write_version_metadata(version_dir, metadata)
-    _update_manifest(safe_intake_id, version, normalized_consumer, timestamp, notes, status="queued")
-        "notes": notes,
-    }
-    _write_version_metadata(version_dir, metadata)
-    _update_manifest(intake_id, version, consumer, timestamp, notes)
+    _update_manifest(safe_intake_id, version, normalized_consumer, timestamp, notes, status=STATUS_PENDING)
+    # Metadata is on disk before the job becomes visible to workers.
+    ready_queue.enqueue(safe_intake_id, version)
     return version
 
 
@@ -218,6 +163,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--consumer", required=True, help="Name of the -3DT consumer supplying the intake inputs")
     parser.add_argument("--version", default=None, help="Optional explicit version tag (e.g., v0002). Defaults to next incremental.")
     parser.add_argument("--notes", default="", help="Optional notes captured in metadata for traceability")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Also roll the manifest log up into _JOBS_MANIFEST.json (O(manifest); by default registration only appends).",
+    )
     return parser.parse_args()
 
 
@@ -233,6 +183,8 @@ def main() -> None:
         requested_version=requested_version,
         notes=notes,
     )
+    if args.compact:
+        manifest_log.compact()
     print(f"Registered intake '{args.intake_id}' for consumer '{args.consumer}' at version {version} (placeholder only).")
 
 
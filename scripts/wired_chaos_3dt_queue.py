@@ -0,0 +1,160 @@
+"""Ready-queue index of pending Wired Chaos 3DT job versions.
+
+Registration appends ``<job_id> <version>`` to an append-only queue file and
+workers pop entries from a persisted read cursor, so finding the next job
+costs the same however much version history sits under JOBS/. All access is
+serialized with an ``fcntl`` lock on a sidecar lock file; consumed entries
+are compacted away once they make up most of the file.
+
+The queue is an index, not the source of truth: ``metadata.json`` status
+still decides whether a version is runnable, so workers skip stale entries,
+``rebuild`` regenerates the queue from a one-off scan of JOBS/, and
+``add_missing`` re-adds pending versions whose entry was popped by a worker
+that died before claiming them.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+BASE_DIR = Path("WIRED_CHAOS_3DT")
+QUEUE_PATH = BASE_DIR / "_READY_QUEUE"
+CURSOR_PATH = BASE_DIR / "_READY_QUEUE.cursor"
+LOCK_PATH = BASE_DIR / "_READY_QUEUE.lock"
+
+# Compact once this many consumed bytes sit ahead of the cursor and they are most of the file.
+COMPACT_MIN_BYTES = 1 << 20
+
+
+@contextlib.contextmanager
+def _locked() -> Iterator[None]:
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with LOCK_PATH.open("a") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temp_path = path.parent / f".{path.name}.tmp.{os.getpid()}"
+    with temp_path.open("wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    temp_path.replace(path)
+
+
+def _read_cursor() -> int:
+    try:
+        return int(CURSOR_PATH.read_text(encoding="utf-8").strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _entry(job_id: str, version: str) -> bytes:
+    return f"{job_id} {version}\n".encode("utf-8")
+
+
+def exists() -> bool:
+    return QUEUE_PATH.exists()
+
+
+def enqueue(job_id: str, version: str) -> None:
+    """Append a pending job version to the ready queue."""
+    with _locked():
+        with QUEUE_PATH.open("ab") as fh:
+            fh.write(_entry(job_id, version))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def pop() -> Optional[Tuple[str, str]]:
+    """Take the oldest unconsumed entry as ``(job_id, version)``, or None when drained."""
+    with _locked():
+        if not QUEUE_PATH.exists():
+            return None
+        cursor = _read_cursor()
+        with QUEUE_PATH.open("rb") as fh:
+            fh.seek(cursor)
+            while True:
+                line = fh.readline()
+                if not line.endswith(b"\n"):
+                    # End of queue, or a partially appended line that is not ready yet.
+                    return None
+                cursor += len(line)
+                parts = line.decode("utf-8", "replace").split()
+                if len(parts) == 2:
+                    break
+            size = fh.seek(0, os.SEEK_END)
+        if cursor >= COMPACT_MIN_BYTES and cursor * 2 >= size:
+            _compact(cursor)
+        else:
+            _write_atomic(CURSOR_PATH, f"{cursor}\n".encode("utf-8"))
+        return parts[0], parts[1]
+
+
+def _compact(cursor: int) -> None:
+    with QUEUE_PATH.open("rb") as fh:
+        fh.seek(cursor)
+        remaining = fh.read()
+    _write_atomic(QUEUE_PATH, remaining)
+    _write_atomic(CURSOR_PATH, b"0\n")
+
+
+def _unconsumed() -> List[Tuple[str, str]]:
+    if not QUEUE_PATH.exists():
+        return []
+    with QUEUE_PATH.open("rb") as fh:
+        fh.seek(_read_cursor())
+        lines = fh.read().decode("utf-8", "replace").splitlines()
+    return [(parts[0], parts[1]) for parts in (line.split() for line in lines) if len(parts) == 2]
+
+
+def pending() -> List[Tuple[str, str]]:
+    """Unconsumed entries, oldest first (for inspection; workers use ``pop``)."""
+    with _locked():
+        return _unconsumed()
+
+
+def rebuild(entries: Iterable[Tuple[str, str]], only_if_missing: bool = False) -> Optional[int]:
+    """Replace the queue with ``entries`` (e.g. from a full JOBS/ scan); returns the count.
+
+    ``entries`` is consumed under the queue lock, so an ``enqueue`` racing the
+    scan lands after the rewrite instead of being overwritten. With
+    ``only_if_missing`` nothing is scanned (and None is returned) when another
+    worker has already created the queue.
+    """
+    with _locked():
+        if only_if_missing and QUEUE_PATH.exists():
+            return None
+        data = b"".join(_entry(job_id, version) for job_id, version in entries)
+        _write_atomic(QUEUE_PATH, data)
+        _write_atomic(CURSOR_PATH, b"0\n")
+    return data.count(b"\n")
+
+
+def add_missing(entries: Iterable[Tuple[str, str]]) -> int:
+    """Append each of ``entries`` that has no unconsumed queue entry; returns how many were added.
+
+    ``pop`` consumes an entry before the worker takes its lease, so a worker
+    dying in between leaves a pending version with no entry. Workers run
+    this over a periodic JOBS/ scan to put such versions back. The scan runs
+    outside the lock; at worst it re-adds an entry a live worker is about to
+    claim, and stale entries are skipped anyway.
+    """
+    candidates = list(entries)
+    with _locked():
+        queued = set(_unconsumed())
+        data = b"".join(_entry(*entry) for entry in candidates if entry not in queued)
+        if data:
+            with QUEUE_PATH.open("ab") as fh:
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+    return data.count(b"\n")
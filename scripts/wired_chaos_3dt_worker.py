@@ -1,39 +1,59 @@
 #!/usr/bin/env python3
 """Wired Chaos 3DT execution worker.
 
-This worker scans the JOBS directory for pending 3DT jobs, claims them,
-performs a deterministic STUB_EXECUTION placeholder render, and advances
-status tracking (pending -> running -> completed/failed). Rendering
-remains mocked; this only operationalizes the first execution hop.
-This worker scans the JOBS directory for queued 3DT jobs, claims them,
-performs a deterministic STUB_EXECUTION placeholder render, and advances
-status tracking (queued -> running -> completed). Rendering remains
-mocked; this only operationalizes the first execution hop.
+This worker takes pending 3DT jobs from the ready queue kept by the
+pipeline (see wired_chaos_3dt_queue), claims them, performs a deterministic
+STUB_EXECUTION placeholder render, and advances status tracking
+(pending -> running -> completed/failed). Rendering remains mocked; this
+only operationalizes the first execution hop.
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures as cf
+import contextlib
+import ctypes
+import ctypes.util
 import datetime as dt
-import fcntl
 import json
 import os
+import select
+import struct
+import sys
+import threading
 import time
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import wired_chaos_3dt_leases as leases  # noqa: E402
+import wired_chaos_3dt_manifest as manifest_log  # noqa: E402
+import wired_chaos_3dt_queue as ready_queue  # noqa: E402
 
 BASE_DIR = Path("WIRED_CHAOS_3DT")
 JOBS_DIR = BASE_DIR / "JOBS"
-MANIFEST_PATH = BASE_DIR / "_JOBS_MANIFEST.json"
 
 STATUS_PENDING = "pending"
 STATUS_QUEUED = "queued"  # legacy alias for pending
 STATUS_RUNNING = "running"
 STATUS_COMPLETED = "completed"
 STATUS_FAILED = "failed"
-STATUS_QUEUED = "queued"
-STATUS_RUNNING = "running"
-STATUS_COMPLETED = "completed"
+RUNNABLE_STATUSES = {STATUS_PENDING, STATUS_QUEUED}
+STATUS_LEASE_LOST = "lease_lost"  # reported only; the job was re-queued by a reaper
+STATUS_EXECUTOR_ERROR = "executor_error"  # reported only; the lease is left to expire and be reaped
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_RESCAN_SECONDS = 600.0
+WORKER_ID = leases.worker_id()
+
+
+class LeaseLost(RuntimeError):
+    """The worker's claim expired and was reaped before the job finished."""
+
+
+def _utc_timestamp() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def _load_json(path: Path) -> Dict:
@@ -46,17 +66,10 @@ def _load_json(path: Path) -> Dict:
             return {}
 
 
-def _save_json(path: Path, payload: Dict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, sort_keys=True)
-        fh.write("\n")
-
-
 def _save_json_atomic(path: Path, payload: Dict) -> None:
     """Save JSON atomically using temp file + rename to prevent partial writes."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    temp_path = path.parent / f".{path.name}.tmp.{os.getpid()}"
+    temp_path = path.parent / f".{path.name}.tmp.{os.getpid()}.{threading.get_ident()}"
     try:
         with temp_path.open("w", encoding="utf-8") as fh:
             json.dump(payload, fh, indent=2, sort_keys=True)
@@ -84,125 +97,57 @@ def _iter_version_metadata() -> Iterable[Tuple[str, str, Path]]:
 
 
 def _update_manifest_status(job_id: str, version: str, status: str, timestamp: str, error: Optional[str] = None) -> None:
-    """Update manifest status with file locking to prevent race conditions.
-    
-    Uses exclusive file locking to ensure that only one worker can update
-    the manifest at a time, preventing concurrent workers from overwriting
-    each other's changes.
-    """
-    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Create manifest file if it doesn't exist
-    if not MANIFEST_PATH.exists():
-        _save_json_atomic(MANIFEST_PATH, {"jobs": {}})
-    
-    # Open manifest file with exclusive lock
-    with MANIFEST_PATH.open("r+", encoding="utf-8") as fh:
-        # Acquire exclusive lock - blocks until available
-        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
-        
-        # Read current manifest state
-        fh.seek(0)
-        try:
-            manifest = json.load(fh)
-        except json.JSONDecodeError:
-            manifest = {"jobs": {}}
-        
-        jobs = manifest.get("jobs", {})
-        job_record = jobs.get(job_id)
-        if not job_record:
-            return
-        
-        updated = False
-        for entry in job_record.get("versions", []):
-            if entry.get("version") == version:
-                entry["status"] = status
-                if status == STATUS_RUNNING:
-                    entry["started_at"] = timestamp
-                elif status == STATUS_COMPLETED:
-                    entry["completed_at"] = timestamp
-                    entry["rendering"] = "STUB_EXECUTION"
-                elif status == STATUS_FAILED:
-                    entry["failed_at"] = timestamp
-                    entry["rendering"] = "STUB_EXECUTION"
-                    if error:
-                        entry["error"] = error
-                updated = True
-                break
-        
-        if updated:
-            # Write back to locked file handle
-            fh.seek(0)
-            fh.truncate()
-            json.dump(manifest, fh, indent=2, sort_keys=True)
-            fh.write("\n")
-            fh.flush()
-            os.fsync(fh.fileno())
-def _update_manifest_status(job_id: str, version: str, status: str, timestamp: str) -> None:
-    manifest = _load_json(MANIFEST_PATH)
-    jobs = manifest.get("jobs", {})
-    job_record = jobs.get(job_id)
-    if not job_record:
-        return
-
-    updated = False
-    for entry in job_record.get("versions", []):
-        if entry.get("version") == version:
-            entry["status"] = status
-            if status == STATUS_RUNNING:
-                entry["started_at"] = timestamp
-            elif status == STATUS_COMPLETED:
-                entry["completed_at"] = timestamp
-                entry["rendering"] = "STUB_EXECUTION"
-            elif status == STATUS_FAILED:
-                entry["failed_at"] = timestamp
-                entry["rendering"] = "STUB_EXECUTION"
-                if error:
-                    entry["error"] = error
-            updated = True
-            break
-
-    if updated:
-        _save_json(MANIFEST_PATH, manifest)
-
-
-def _claim_job(metadata_path: Path) -> Optional[Dict]:
-    metadata = _load_json(metadata_path)
-    if metadata.get("status") not in {STATUS_PENDING, STATUS_QUEUED}:
+    """Record a status transition in the manifest log (one O(1) append; see wired_chaos_3dt_manifest)."""
+    fields: Dict[str, Any] = {"status": status}
+    if status == STATUS_PENDING:
+        fields["requeued_at"] = timestamp
+    elif status == STATUS_RUNNING:
+        fields["started_at"] = timestamp
+    elif status == STATUS_COMPLETED:
+        fields["completed_at"] = timestamp
+        fields["rendering"] = "STUB_EXECUTION"
+    elif status == STATUS_FAILED:
+        fields["failed_at"] = timestamp
+        fields["rendering"] = "STUB_EXECUTION"
+        if error:
+            fields["error"] = error
+    manifest_log.record_update(job_id, version, fields)
+
+
+def _claim_lease(metadata: Dict) -> Dict:
+    return {"job_id": metadata["job_id"], "version": metadata["version"], "token": metadata.get("lease_token")}
+
+
+@contextlib.contextmanager
+def _still_claimed(metadata: Dict) -> Iterator[None]:
+    """Hold the lease lock while writing job state, so the lease cannot be reaped and re-claimed mid-write."""
+    with leases.held(_claim_lease(metadata)) as ours:
+        if not ours:
+            raise LeaseLost(f"lease on {metadata['job_id']}@{metadata['version']} expired and was reaped")
+        yield
+
+
+def _claim_job(metadata_path: Path, job_id: str, version: str, ttl: float) -> Optional[Tuple[Dict, Dict]]:
+    """Claim a version as ``(metadata, lease)``; None when it is leased elsewhere or no longer runnable."""
+    lease = leases.acquire(job_id, version, WORKER_ID, ttl)
+    if lease is None:
+        # Another worker holds this job.
         return None
 
-    metadata["status"] = STATUS_RUNNING
-    metadata["started_at"] = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    _save_json(metadata_path, metadata)
-    _update_manifest_status(metadata["job_id"], metadata["version"], STATUS_RUNNING, metadata["started_at"])
-    return metadata
-    lock_path = metadata_path.with_suffix(".lock")
-    try:
-        lock_path.open("x").close()
-    except FileExistsError:
-        # Another worker is already claiming or processing this job.
+    # Status only changes under a lease, so this check cannot race another claimer.
+    metadata = _load_json(metadata_path)
+    if metadata.get("status") not in RUNNABLE_STATUSES:
+        leases.release(lease)
         return None
 
     metadata["status"] = STATUS_RUNNING
-    metadata["started_at"] = dt.datetime.now(dt.UTC).isoformat(timespec="seconds") + "Z"
-    _save_json(metadata_path, metadata)
+    metadata["started_at"] = _utc_timestamp()
+    metadata["claimed_by"] = WORKER_ID
+    metadata["lease_token"] = lease["token"]
+    metadata["attempts"] = metadata.get("attempts", 0) + 1
+    _save_json_atomic(metadata_path, metadata)
     _update_manifest_status(metadata["job_id"], metadata["version"], STATUS_RUNNING, metadata["started_at"])
-    return metadata
-    try:
-        metadata = _load_json(metadata_path)
-        if metadata.get("status") != STATUS_QUEUED:
-            return None
-
-        metadata["status"] = STATUS_RUNNING
-        metadata["started_at"] = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
-        _save_json(metadata_path, metadata)
-        _update_manifest_status(
-            metadata["job_id"], metadata["version"], STATUS_RUNNING, metadata["started_at"]
-        )
-        return metadata
-    finally:
-        if lock_path.exists():
-            lock_path.unlink()
+    return metadata, lease
 
 
 def _complete_job(metadata_path: Path, metadata: Dict) -> None:
@@ -215,98 +160,452 @@ def _complete_job(metadata_path: Path, metadata: Dict) -> None:
                 "- Rendering mocked for deterministic pipeline bring-up.",
                 "- No GPU or renderer selected; this is a placeholder output stage.",
                 f"- Job: {metadata.get('job_id')}, Version: {metadata.get('version')}.",
-                f"- Claimed by: Wired Chaos worker.",
+                "- Claimed by: Wired Chaos worker.",
             ]
         )
         + "\n",
         encoding="utf-8",
     )
 
-    metadata["status"] = STATUS_COMPLETED
-    metadata["completed_at"] = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    metadata["completed_at"] = dt.datetime.now(dt.UTC).isoformat(timespec="seconds") + "Z"
-    metadata["rendering"] = "STUB_EXECUTION"
-    _save_json(metadata_path, metadata)
-    _update_manifest_status(metadata["job_id"], metadata["version"], STATUS_COMPLETED, metadata["completed_at"])
+    with _still_claimed(metadata):
+        metadata.pop("lease_token", None)
+        metadata["status"] = STATUS_COMPLETED
+        metadata["completed_at"] = _utc_timestamp()
+        metadata["rendering"] = "STUB_EXECUTION"
+        _save_json_atomic(metadata_path, metadata)
+        _update_manifest_status(metadata["job_id"], metadata["version"], STATUS_COMPLETED, metadata["completed_at"])
 
 
 def _fail_job(metadata_path: Path, metadata: Dict, error: Exception) -> None:
-    metadata["status"] = STATUS_FAILED
-    metadata["failed_at"] = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    metadata["rendering"] = "STUB_EXECUTION"
-    metadata["error"] = str(error)
-    _save_json(metadata_path, metadata)
-    _update_manifest_status(metadata["job_id"], metadata["version"], STATUS_FAILED, metadata["failed_at"], error=str(error))
+    with _still_claimed(metadata):
+        metadata.pop("lease_token", None)
+        metadata["status"] = STATUS_FAILED
+        metadata["failed_at"] = _utc_timestamp()
+        metadata["rendering"] = "STUB_EXECUTION"
+        metadata["error"] = str(error)
+        _save_json_atomic(metadata_path, metadata)
+        _update_manifest_status(metadata["job_id"], metadata["version"], STATUS_FAILED, metadata["failed_at"], error=str(error))
 
 
-def _next_queued_job() -> Optional[Tuple[Dict, Path]]:
+def _scan_runnable() -> Iterable[Tuple[str, str]]:
     for job_id, version, metadata_path in _iter_version_metadata():
+        if _load_json(metadata_path).get("status") in RUNNABLE_STATUSES:
+            yield job_id, version
+
+
+def rebuild_index(only_if_missing: bool = False) -> Optional[int]:
+    """Regenerate the ready queue from a full scan of JOBS/ (bootstrap or recovery)."""
+    return ready_queue.rebuild(_scan_runnable(), only_if_missing=only_if_missing)
+
+
+def rescan_index(verbose: bool = False) -> int:
+    """Re-queue pending versions that lost their queue entry (popped by a worker that died before claiming)."""
+    added = ready_queue.add_missing(_scan_runnable())
+    if verbose and added:
+        print(f"Re-queued {added} pending job version(s) missing from the ready queue.")
+    return added
+
+
+def reap_expired(verbose: bool = False) -> int:
+    """Re-queue jobs whose worker stopped heartbeating; returns how many were re-queued."""
+    requeued = 0
+    now = time.time()
+    for lease in leases.active():
+        if not leases.take_expired(lease, now):
+            continue
+        job_id, version = lease["job_id"], lease["version"]
+        metadata_path = JOBS_DIR / job_id / "versions" / version / "metadata.json"
         metadata = _load_json(metadata_path)
-        if metadata.get("status") in {STATUS_PENDING, STATUS_QUEUED}:
+        if metadata.get("status") not in {STATUS_RUNNING, *RUNNABLE_STATUSES}:
+            # The holder finished but died before releasing its lease.
+            continue
+        metadata["status"] = STATUS_PENDING
+        metadata["requeued_at"] = _utc_timestamp()
+        metadata.pop("lease_token", None)
+        _save_json_atomic(metadata_path, metadata)
+        _update_manifest_status(job_id, version, STATUS_PENDING, metadata["requeued_at"])
+        ready_queue.enqueue(job_id, version)
+        requeued += 1
+        if verbose:
+            print(f"Re-queued {job_id}@{version}: lease held by {lease.get('owner')} expired.")
+    return requeued
+
+
 def _next_queued_job() -> Optional[Tuple[Dict, Path]]:
-    for job_id, version, metadata_path in _iter_version_metadata():
+    if not ready_queue.exists():
+        # Trees registered before the queue existed are indexed once, by whichever worker gets the lock first.
+        rebuild_index(only_if_missing=True)
+    while True:
+        entry = ready_queue.pop()
+        if entry is None:
+            return None
+        job_id, version = entry
+        metadata_path = JOBS_DIR / job_id / "versions" / version / "metadata.json"
         metadata = _load_json(metadata_path)
-        if metadata.get("status") == STATUS_QUEUED:
+        # Entries are hints; skip any whose version has since been claimed or removed.
+        if metadata.get("status") in RUNNABLE_STATUSES:
             return metadata, metadata_path
-    return None
 
 
-def run_once(verbose: bool = False) -> bool:
-    queued = _next_queued_job()
-    if not queued:
-        if verbose:
-            print("No queued jobs discovered.")
-        return False
+def _claim_next(heartbeat: leases.Heartbeat, verbose: bool = False) -> Optional[Tuple[Dict, Path, float]]:
+    """Claim the next runnable job as ``(metadata, path, claim_ms)``, or None when drained.
 
-    metadata, path = queued
-    if verbose:
-        print(f"Claiming job {metadata.get('job_id')}@{metadata.get('version')}")
-    claimed = _claim_job(path)
-    if not claimed:
+    The claim's lease is registered with ``heartbeat``; see ``_finish_claim`` for its release.
+    """
+    while True:
+        started = time.perf_counter()
+        queued = _next_queued_job()
+        if not queued:
+            return None
+        metadata, path = queued
+        if verbose:
+            print(f"Claiming job {metadata.get('job_id')}@{metadata.get('version')}")
+        claimed = _claim_job(path, metadata["job_id"], metadata["version"], heartbeat.ttl)
+        if claimed:
+            claimed_metadata, lease = claimed
+            heartbeat.add(lease)
+            return claimed_metadata, path, (time.perf_counter() - started) * 1000
         if verbose:
             print("Job already claimed by another worker.")
-        return False
 
-    if verbose:
-        print("Executing STUB_EXECUTION placeholder render…")
+
+def _execute_job(metadata_path: str, metadata: Dict) -> Dict[str, Any]:
+    """Run one claimed job to completed/failed; module-level so process pools can pickle it.
+
+    The lease stays in place: the caller stops heartbeating it, then releases it.
+    """
+    path = Path(metadata_path)
+    started = time.perf_counter()
     try:
-        _complete_job(path, claimed)
-        if verbose:
-            print("Job completed.")
-        return True
+        _complete_job(path, metadata)
+        status, error = STATUS_COMPLETED, None
+    except LeaseLost as exc:
+        status, error = STATUS_LEASE_LOST, str(exc)
     except Exception as exc:  # pragma: no cover - defensive to keep worker deterministic
-        _fail_job(path, claimed, exc)
+        try:
+            _fail_job(path, metadata, exc)
+            status, error = STATUS_FAILED, str(exc)
+        except LeaseLost as lost:
+            status, error = STATUS_LEASE_LOST, str(lost)
+    return {
+        "job_id": metadata.get("job_id"),
+        "version": metadata.get("version"),
+        "status": status,
+        "error": error,
+        "execute_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def _finish_claim(heartbeat: leases.Heartbeat, lease: Dict, executed: bool) -> None:
+    # Stop renewing first, so the heartbeat never touches a lease that is being released.
+    heartbeat.discard(lease)
+    if executed:
+        leases.release(lease)
+    # Otherwise the job's state is unknown: let the lease expire so a reaper re-queues it.
+
+
+def _report_job(timing: Dict[str, Any]) -> None:
+    line = (
+        f"{timing['job_id']}@{timing['version']} {timing['status']}: claim {timing['claim_ms']:.1f} ms, "
+        f"execute {timing['execute_ms']:.1f} ms, wall {timing['wall_ms']:.1f} ms"
+    )
+    if timing["error"]:
+        line += f" ({timing['error']})"
+    print(line, flush=True)
+
+
+def run_once(verbose: bool = False, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+    reap_expired(verbose=verbose)
+    heartbeat = leases.Heartbeat(lease_seconds)
+    try:
+        claimed = _claim_next(heartbeat, verbose=verbose)
+        if not claimed:
+            if verbose:
+                print("No queued jobs discovered.")
+            return False
+
+        metadata, path, claim_ms = claimed
         if verbose:
-            print(f"Job failed: {exc}")
-        return False
-    _complete_job(path, claimed)
+            print("Executing STUB_EXECUTION placeholder render…")
+        started = time.perf_counter()
+        lease = _claim_lease(metadata)
+        executed = False
+        try:
+            timing = _execute_job(str(path), metadata)
+            executed = True
+        finally:
+            _finish_claim(heartbeat, lease, executed)
+    finally:
+        heartbeat.stop()
+    timing.update(claim_ms=claim_ms, wall_ms=claim_ms + (time.perf_counter() - started) * 1000)
     if verbose:
-        print("Job completed.")
-    return True
+        _report_job(timing)
+    return timing["status"] == STATUS_COMPLETED
+
+
+def drain(
+    executor: cf.Executor,
+    concurrency: int,
+    heartbeat: leases.Heartbeat,
+    verbose: bool = False,
+) -> List[Dict[str, Any]]:
+    """Claim and run queued jobs, up to ``concurrency`` at once, until the queue is empty.
+
+    Expired leases are re-queued first. Claims happen here in the calling
+    thread (they are cheap and keep the queue order), and ``heartbeat`` keeps
+    their leases alive while execution runs on ``executor``. Returns one
+    timing record per job.
+    """
+    reap_expired(verbose=verbose)
+    started = time.perf_counter()
+    in_flight: Dict[cf.Future, Tuple[float, float, Dict]] = {}
+    timings: List[Dict[str, Any]] = []
+    while True:
+        while len(in_flight) < concurrency:
+            claimed = _claim_next(heartbeat, verbose=verbose)
+            if claimed is None:
+                break
+            metadata, path, claim_ms = claimed
+            # Taken before submitting: a thread-pool job drops ``lease_token`` from ``metadata`` as it finishes.
+            lease = _claim_lease(metadata)
+            future = executor.submit(_execute_job, str(path), metadata)
+            in_flight[future] = (time.perf_counter() - claim_ms / 1000, claim_ms, lease)
+        if not in_flight:
+            break
+        done, _ = cf.wait(in_flight, return_when=cf.FIRST_COMPLETED)
+        for future in done:
+            claim_started, claim_ms, lease = in_flight.pop(future)
+            try:
+                timing = future.result()
+            except Exception as exc:  # noqa: BLE001 - e.g. a crashed pool process; keep draining the rest
+                _finish_claim(heartbeat, lease, executed=False)
+                timing = {
+                    "job_id": lease["job_id"],
+                    "version": lease["version"],
+                    "status": STATUS_EXECUTOR_ERROR,
+                    "error": f"{type(exc).__name__}: {exc}",
+                    "execute_ms": (time.perf_counter() - claim_started) * 1000 - claim_ms,
+                }
+            else:
+                _finish_claim(heartbeat, lease, executed=True)
+            timing.update(claim_ms=claim_ms, wall_ms=(time.perf_counter() - claim_started) * 1000)
+            _report_job(timing)
+            timings.append(timing)
+    if timings:
+        elapsed = time.perf_counter() - started
+        print(
+            f"Drained {len(timings)} job(s) in {elapsed:.2f}s ({len(timings) / elapsed:.1f} jobs/s, "
+            f"concurrency {concurrency}).",
+            flush=True,
+        )
+    elif verbose:
+        print("No queued jobs discovered.")
+    return timings
 
 
-def run_loop(poll_seconds: float, verbose: bool = False) -> None:
-    while True:
-        work_done = run_once(verbose=verbose)
-        if not work_done and verbose:
-            print(f"Sleeping for {poll_seconds} seconds before next check…")
-        time.sleep(poll_seconds)
+def _make_executor(kind: str, concurrency: int) -> cf.Executor:
+    if kind == "process":
+        return cf.ProcessPoolExecutor(max_workers=concurrency)
+    return cf.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="3dt-job")
+
+
+# inotify(7) constants; the watcher only needs "something was written or created here".
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _PollWatcher:
+    """Fallback wake-up source: wake every ``poll_seconds``."""
+
+    mode = "poll"
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    """Blocks on inotify events for JOBS/, the manifest and the ready queue (Linux only)."""
+
+    mode = "inotify"
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._relevant: Dict[int, Optional[Set[str]]] = {}
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        # BASE_DIR holds the manifest and ready queue, which are rewritten by rename or append,
+        # so the directory is watched and events are filtered by name.
+        for path, names in (
+            (BASE_DIR, {manifest_log.MANIFEST_PATH.name, ready_queue.QUEUE_PATH.name}),
+            (JOBS_DIR, None),
+        ):
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(errno, f"inotify_add_watch failed for {path}")
+            self._relevant[wd] = names
+
+    def _drain(self) -> bool:
+        relevant = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(buf):
+                wd, _mask, _cookie, length = _IN_EVENT_HEADER.unpack_from(buf, offset)
+                offset += _IN_EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+                offset += length
+                names = self._relevant.get(wd)
+                if names is None or name in names:
+                    relevant = True
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a relevant event or ``timeout``; True when woken by an event."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready and self._drain():
+                return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _make_watcher(mode: str, verbose: bool = False):
+    if mode in {"auto", "inotify"} and sys.platform.startswith("linux"):
+        try:
+            return _InotifyWatcher()
+        except (OSError, AttributeError) as exc:
+            if mode == "inotify":
+                raise
+            if verbose:
+                print(f"inotify unavailable ({exc}); falling back to polling.")
+    elif mode == "inotify":
+        raise SystemExit("--watch-mode inotify requires Linux")
+    return _PollWatcher()
+
+
+def run_loop(
+    poll_seconds: float,
+    verbose: bool = False,
+    watch_mode: str = "auto",
+    concurrency: int = 1,
+    executor_kind: str = "thread",
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    rescan_seconds: float = DEFAULT_RESCAN_SECONDS,
+) -> None:
+    watcher = _make_watcher(watch_mode, verbose=verbose)
+    heartbeat = leases.Heartbeat(lease_seconds)
+    # Wake at least twice per lease so expired claims from dead workers are reaped even when idle.
+    wait_seconds = min(poll_seconds, lease_seconds / 2)
+    if verbose:
+        print(f"Watching for queued jobs ({watcher.mode}, concurrency {concurrency}) as {WORKER_ID}.")
+    next_rescan = time.monotonic() + rescan_seconds
+    try:
+        with _make_executor(executor_kind, concurrency) as executor:
+            while True:
+                if rescan_seconds > 0 and time.monotonic() >= next_rescan:
+                    rescan_index(verbose=verbose)
+                    next_rescan = time.monotonic() + rescan_seconds
+                drain(executor, concurrency, heartbeat, verbose=verbose)
+                if verbose and watcher.mode == "poll":
+                    print(f"Sleeping for {wait_seconds} seconds before next check…")
+                # In inotify mode this is only a safety net for missed events and for reaping.
+                watcher.wait(wait_seconds)
+    finally:
+        heartbeat.stop()
+        watcher.close()
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Execute queued Wired Chaos 3DT jobs (STUB_EXECUTION stage).")
-    parser.add_argument("--poll-seconds", type=float, default=10.0, help="Polling interval when running in watch mode.")
+    parser.add_argument("--poll-seconds", type=float, default=10.0, help="Polling interval in watch mode (safety rescan interval with inotify).")
     parser.add_argument("--watch", action="store_true", help="Continuously watch for queued jobs.")
+    parser.add_argument(
+        "--watch-mode",
+        choices=("auto", "inotify", "poll"),
+        default="auto",
+        help="Wake-up source in watch mode: inotify events (Linux), fixed polling, or auto (inotify when available).",
+    )
+    parser.add_argument("--drain", action="store_true", help="Run every queued job, then exit (default: one job).")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs executed at once with --drain or --watch.")
+    parser.add_argument(
+        "--executor",
+        choices=("thread", "process"),
+        default="thread",
+        help="Pool used to execute jobs; use process for CPU-bound renders.",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help="Claim lease length; heartbeats renew it every third of this, and expired leases are re-queued.",
+    )
+    parser.add_argument(
+        "--rescan-seconds",
+        type=float,
+        default=DEFAULT_RESCAN_SECONDS,
+        help="In watch mode, how often a full JOBS/ scan re-queues pending versions missing from the ready queue (0 disables).",
+    )
+    parser.add_argument("--reap", action="store_true", help="Re-queue jobs with expired leases and exit.")
+    parser.add_argument(
+        "--compact-manifest",
+        action="store_true",
+        help="Roll the manifest transition log up into _JOBS_MANIFEST.json and exit.",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging.")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild the ready queue from a full JOBS/ scan and exit.")
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    if args.watch:
-        run_loop(poll_seconds=args.poll_seconds, verbose=args.verbose)
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1")
+    if args.lease_seconds <= 0:
+        raise SystemExit("--lease-seconds must be positive")
+    if args.rebuild_index:
+        print(f"Indexed {rebuild_index()} pending job version(s).")
+    elif args.compact_manifest:
+        manifest_log.compact()
+        print(f"Compacted manifest log into {manifest_log.MANIFEST_PATH}.")
+    elif args.reap:
+        print(f"Re-queued {reap_expired(verbose=args.verbose)} job version(s) with expired leases.")
+    elif args.watch:
+        run_loop(
+            poll_seconds=args.poll_seconds,
+            verbose=args.verbose,
+            watch_mode=args.watch_mode,
+            concurrency=args.concurrency,
+            executor_kind=args.executor,
+            lease_seconds=args.lease_seconds,
+            rescan_seconds=args.rescan_seconds,
+        )
+    elif args.drain:
+        heartbeat = leases.Heartbeat(args.lease_seconds)
+        try:
+            with _make_executor(args.executor, args.concurrency) as executor:
+                drain(executor, args.concurrency, heartbeat, verbose=args.verbose)
+        finally:
+            heartbeat.stop()
     else:
-        run_once(verbose=args.verbose)
+        run_once(verbose=args.verbose, lease_seconds=args.lease_seconds)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+"""VisionStruct: Vision-to-JSON extraction agent for the Swarm bus and HTTP.
+
+Public names are imported lazily on first access, so a Swarm worker that only
+needs ``VisionStructAgent`` and the schemas never loads FastAPI or uvicorn
+(only ``vision_struct.http`` does), and Pillow is loaded only when image
+pre-processing is used.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict, List
+
+_EXPORTS: Dict[str, str] = {
+    "VISION_TO_JSON_SYSTEM_PROMPT": "prompt",
+    "VISION_TO_JSON_SYSTEM_PROMPT_SHA256": "prompt",
+    "JSON_CODEC": "codec",
+    "json_loads": "codec",
+    "json_dumps": "codec",
+    "REPAIR_STRIPPED_FENCE": "codec",
+    "REPAIR_SKIPPED_LEADING_TEXT": "codec",
+    "REPAIR_IGNORED_TRAILING_TEXT": "codec",
+    "REPAIR_CLOSED_TRUNCATED": "codec",
+    "TopLevelMemberStream": "codec",
+    "extract_json_object": "codec",
+    "SwarmMessageType": "schemas",
+    "VisionJobRequest": "schemas",
+    "VisionJobResult": "schemas",
+    "VisionJobError": "schemas",
+    "VisionBatchItem": "schemas",
+    "SwarmEnvelope": "schemas",
+    "MultiModalModelClient": "client",
+    "MultiModalClientPool": "client",
+    "VisionResultCache": "cache",
+    "normalize_image_bytes": "preprocess",
+    "ImagePreprocessor": "preprocess",
+    "DEFAULT_LATENCY_BUCKETS": "metrics",
+    "STAGE_TIMINGS": "metrics",
+    "VisionMetrics": "metrics",
+    "AdmissionRejected": "ratelimit",
+    "TokenBucket": "ratelimit",
+    "VisionRateLimiter": "ratelimit",
+    "ProviderDeadlineExceeded": "resilience",
+    "CircuitOpenError": "resilience",
+    "RetryPolicy": "resilience",
+    "CircuitBreaker": "resilience",
+    "SchemaValidationError": "validation",
+    "VisionSchemaValidator": "validation",
+    "prompt_schema_validator": "validation",
+    "VisionStructAgent": "agent",
+    "MAX_ENVELOPE_BYTES": "swarm",
+    "SwarmTransport": "swarm",
+    "AsyncioQueueTransport": "swarm",
+    "UnixSocketTransport": "swarm",
+    "SwarmWorker": "swarm",
+    "serve_swarm_socket": "swarm",
+    "VisionServiceSettings": "settings",
+    "load_model_client": "settings",
+    "build_rate_limiter": "settings",
+    "build_agent": "settings",
+    "MAX_BATCH_ITEMS": "http",
+    "TIMING_REQUEST_HEADER": "http",
+    "VisionJSONResponse": "http",
+    "HttpVisionRequest": "http",
+    "HttpVisionResponse": "http",
+    "HttpVisionBatchRequest": "http",
+    "HttpVisionBatchItem": "http",
+    "HttpVisionBatchResponse": "http",
+    "create_app": "http",
+    "app": "http",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
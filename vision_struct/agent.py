@@ -0,0 +1,556 @@
+"""The Swarm-pluggable VisionStruct agent."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, Optional, List, Literal, Sequence, Tuple
+import asyncio
+import base64
+import concurrent.futures
+import contextlib
+import functools
+import time
+
+from .cache import VisionResultCache
+from .client import MultiModalClientPool, MultiModalModelClient, timeout_kwargs
+from .codec import REPAIR_CLOSED_TRUNCATED, TopLevelMemberStream, extract_json_object, json_loads
+from .metrics import STAGE_TIMINGS, VisionMetrics
+from .prompt import VISION_TO_JSON_SYSTEM_PROMPT
+from .ratelimit import AdmissionRejected, VisionRateLimiter
+from .resilience import CircuitBreaker, ProviderDeadlineExceeded, RetryPolicy
+from .schemas import (
+    SwarmEnvelope,
+    SwarmMessageType,
+    VisionBatchItem,
+    VisionJobError,
+    VisionJobRequest,
+    VisionJobResult,
+)
+from .validation import SchemaValidationError, VisionSchemaValidator
+
+if TYPE_CHECKING:  # Pillow and its process pool are only loaded when pre-processing is used.
+    from .preprocess import ImagePreprocessor
+
+# Classifies provider errors for the circuit breaker when the agent has no retry policy.
+_DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# What a call cut off by its deadline raises, from either path (distinct classes before Python 3.11).
+_TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+class VisionStructAgent:
+    """Swarm-compatible agent for Vision-to-JSON jobs."""
+
+    def __init__(
+        self,
+        model_client: MultiModalModelClient,
+        agent_name: str = "vision_struct",
+        max_batch_concurrency: int = 8,
+        cache: Optional[VisionResultCache] = None,
+        coalesce: bool = True,
+        tolerant_json: bool = True,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        metrics: Optional[VisionMetrics] = None,
+        rate_limiter: Optional[VisionRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        call_timeout: Optional[float] = None,
+        schema_validator: Optional[VisionSchemaValidator] = None,
+        schema_mode: Literal["strict", "report"] = "report",
+    ):
+        self.model_client = model_client
+        self.agent_name = agent_name
+        self.max_batch_concurrency = max_batch_concurrency
+        self.cache = cache
+        self.coalesce = coalesce
+        self.tolerant_json = tolerant_json
+        self.preprocessor = preprocessor
+        self.metrics = metrics
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        # Seconds allowed for a job's model call, retries and backoff included.
+        self.call_timeout = call_timeout
+        # Blocking calls run here when a deadline is set, so the caller can stop waiting at the deadline.
+        self._deadline_executor: Optional[ThreadPoolExecutor] = None
+        # "strict" fails jobs whose output breaks the schema; "report" returns the issues with the result.
+        self.schema_validator = schema_validator
+        self.schema_mode = schema_mode
+        # In-flight model calls by content key, shared by identical concurrent jobs.
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced_calls = 0
+
+    def run_job(self, job: VisionJobRequest) -> VisionJobResult:
+        with self._job_scope(job):
+            with self._stage("decode", job):
+                image_bytes = self._decode_image(job)
+                cache_key, cached = self._cache_lookup(image_bytes)
+            if cached is not None:
+                with self._stage("validate", job):
+                    return self._build_result(job, cached, schema_issues=self._check_schema(job, cached))
+
+            if self.rate_limiter is not None:
+                with self._stage("admission", job), self._admission_errors(job):
+                    self.rate_limiter.acquire_sync(self.model_client.model_name, job.project)
+            if self.preprocessor is not None:
+                with self._stage("preprocess", job):
+                    image_bytes = self.preprocessor.process(image_bytes)
+            with self._stage("model", job):
+                raw_output = self._call_model(job, image_bytes)
+            with self._stage("parse", job):
+                json_obj, repairs = self._parse_output(raw_output)
+            with self._stage("validate", job):
+                issues = self._check_schema(job, json_obj)
+                self._remember(cache_key, json_obj, repairs)
+                return self._build_result(job, json_obj, repairs, issues)
+
+    async def arun_job(self, job: VisionJobRequest) -> VisionJobResult:
+        """Async ``run_job``; awaits the model call instead of blocking the loop.
+
+        With ``coalesce`` enabled, concurrent jobs for the same image, model and
+        prompt share a single in-flight model call and all receive its result.
+        """
+        with self._job_scope(job):
+            with self._stage("decode", job):
+                image_bytes = self._decode_image(job)
+                cache_key, cached = await self._acache_lookup(image_bytes)
+            if cached is not None:
+                with self._stage("validate", job):
+                    return self._build_result(job, cached, schema_issues=self._check_schema(job, cached))
+
+            if not self.coalesce:
+                parsed = await self._acall_and_parse(job, image_bytes, cache_key)
+            else:
+                flight_key = cache_key or VisionResultCache.make_key(image_bytes, self.model_client.model_name)
+                flight = self._inflight.get(flight_key)
+                if flight is None:
+                    flight = asyncio.ensure_future(self._acall_and_parse(job, image_bytes, cache_key))
+                    self._inflight[flight_key] = flight
+                    flight.add_done_callback(functools.partial(self._end_flight, flight_key))
+                else:
+                    self.coalesced_calls += 1
+                # Shield so one caller giving up does not cancel the call for the others.
+                parsed = await asyncio.shield(flight)
+
+            with self._stage("validate", job):
+                return self._build_result(job, *parsed)
+
+    @contextlib.contextmanager
+    def _stage(self, stage: str, job: VisionJobRequest) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            timings = STAGE_TIMINGS.get()
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+            if self.metrics is not None:
+                labels = (stage,) + self.metrics.job_labels(job.project, job.context_tags)
+                self.metrics.observe("vision_stage_seconds", labels, elapsed)
+
+    @contextlib.contextmanager
+    def _job_scope(self, job: VisionJobRequest) -> Iterator[None]:
+        outcome = "error"
+        try:
+            with self._stage("total", job):
+                yield
+            outcome = "success"
+        finally:
+            if self.metrics is not None:
+                labels = self.metrics.job_labels(job.project, job.context_tags) + (outcome,)
+                self.metrics.inc("vision_jobs_total", labels)
+
+    @contextlib.contextmanager
+    def _provider_call(self, job: VisionJobRequest) -> Iterator[None]:
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_call()
+        finished = False
+        try:
+            yield
+            finished = True
+            if breaker is not None:
+                breaker.record_success()
+        except Exception as exc:
+            finished = True
+            if breaker is not None:
+                if (self.retry_policy or _DEFAULT_RETRY_POLICY).is_transient(exc):
+                    breaker.record_failure()
+                else:
+                    # Caller errors say nothing about provider health: neither open nor close the circuit.
+                    breaker.record_abandoned()
+            if self.metrics is not None:
+                labels = (self.model_client.model_name,) + self.metrics.job_labels(job.project, job.context_tags)
+                self.metrics.inc("vision_provider_errors_total", labels)
+            raise
+        finally:
+            if not finished and breaker is not None:
+                breaker.record_abandoned()
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ProviderDeadlineExceeded(f"Model call exceeded its {self.call_timeout}s deadline.")
+        return remaining
+
+    def _retry_delay(self, exc: Exception, attempt: int, deadline: Optional[float]) -> Optional[float]:
+        """Backoff before the next attempt, or None if ``exc`` should be raised.
+
+        ``ProviderDeadlineExceeded`` replaces ``exc`` only for a timeout at the
+        deadline; any other provider error is raised as itself.
+        """
+        expired = deadline is not None and time.monotonic() >= deadline
+        if expired and isinstance(exc, _TIMEOUT_ERRORS):
+            raise ProviderDeadlineExceeded(f"Model call exceeded its {self.call_timeout}s deadline.") from exc
+        if expired or self.retry_policy is None or not self.retry_policy.should_retry(exc, attempt):
+            return None
+        delay = self.retry_policy.backoff(attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        if self.metrics is not None:
+            self.metrics.inc("vision_provider_retries_total", (self.model_client.model_name,))
+        return delay
+
+    def _call_with_deadline(self, image_bytes: bytes, timeout: Optional[float]) -> str:
+        call = functools.partial(
+            self.model_client.call_model,
+            image_bytes=image_bytes,
+            system_prompt=VISION_TO_JSON_SYSTEM_PROMPT,
+            **timeout_kwargs(self.model_client.call_model, timeout),
+        )
+        if timeout is None:
+            return call()
+        # Enforced here too, for clients that ignore ``timeout``. A call past its
+        # deadline is abandoned, not interrupted: it keeps its thread until it returns.
+        if self._deadline_executor is None:
+            self._deadline_executor = ThreadPoolExecutor(
+                max_workers=self.model_client.max_sync_workers,
+                thread_name_prefix=f"deadline-{self.model_client.model_name}",
+            )
+        future = self._deadline_executor.submit(call)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Model call did not return within {timeout:.3f}s.") from None
+
+    def _call_model(self, job: VisionJobRequest, image_bytes: bytes) -> str:
+        deadline = None if self.call_timeout is None else time.monotonic() + self.call_timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self._remaining(deadline)
+            try:
+                with self._provider_call(job):
+                    return self._call_with_deadline(image_bytes, timeout)
+            except Exception as exc:  # noqa: BLE001
+                delay = self._retry_delay(exc, attempt, deadline)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            if self.rate_limiter is not None:
+                with self._admission_errors(job):
+                    self.rate_limiter.acquire_sync(self.model_client.model_name, job.project)
+
+    async def _acall_model(self, job: VisionJobRequest, image_bytes: bytes) -> str:
+        deadline = None if self.call_timeout is None else time.monotonic() + self.call_timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self._remaining(deadline)
+            try:
+                with self._provider_call(job):
+                    call = self.model_client.acall_model(
+                        image_bytes=image_bytes,
+                        system_prompt=VISION_TO_JSON_SYSTEM_PROMPT,
+                        **timeout_kwargs(self.model_client.acall_model, timeout),
+                    )
+                    # Enforced here too, for clients that ignore ``timeout``.
+                    return await (call if timeout is None else asyncio.wait_for(call, timeout))
+            except Exception as exc:  # noqa: BLE001
+                delay = self._retry_delay(exc, attempt, deadline)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            if self.rate_limiter is not None:
+                with self._admission_errors(job):
+                    await self.rate_limiter.acquire(self.model_client.model_name, job.project)
+
+    @contextlib.contextmanager
+    def _admission_errors(self, job: VisionJobRequest) -> Iterator[None]:
+        try:
+            yield
+        except AdmissionRejected as exc:
+            if self.metrics is not None:
+                self.metrics.inc("vision_admission_rejected_total", (exc.scope, self.metrics.project_label(job.project)))
+            raise
+
+    async def _admit(self, job: VisionJobRequest) -> None:
+        if self.rate_limiter is not None:
+            with self._stage("admission", job), self._admission_errors(job):
+                await self.rate_limiter.acquire(self.model_client.model_name, job.project)
+
+    def close(self) -> None:
+        """Release the model client, cache and pre-processing resources."""
+        self.model_client.close()
+        if self._deadline_executor is not None:
+            self._deadline_executor.shutdown(wait=False)
+            self._deadline_executor = None
+        if self.cache is not None:
+            self.cache.close()
+        if self.preprocessor is not None:
+            self.preprocessor.close()
+
+    def metrics_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Point-in-time ``{"gauges": ..., "counters": ...}`` (cache, coalescing, pool) for ``VisionMetrics.render``.
+
+        Running totals are counters so ``rate()`` and ``increase()`` handle process restarts.
+        """
+        gauges: Dict[str, float] = {}
+        counters: Dict[str, float] = {"vision_coalesced_calls_total": self.coalesced_calls}
+        if self.cache is not None:
+            stats = self.cache.stats()
+            counters["vision_cache_hits_total"] = stats["hits"]
+            counters["vision_cache_disk_hits_total"] = stats["disk_hits"]
+            counters["vision_cache_misses_total"] = stats["misses"]
+            gauges["vision_cache_hit_ratio"] = stats["hit_ratio"]
+            gauges["vision_cache_memory_entries"] = stats["memory_entries"]
+        if self.rate_limiter is not None:
+            stats = self.rate_limiter.stats()
+            gauges["vision_ratelimit_waiting"] = stats["waiting"]
+            counters["vision_ratelimit_admitted_total"] = stats["admitted"]
+            counters["vision_ratelimit_rejected_total"] = stats["rejected"]
+        if self.circuit_breaker is not None:
+            gauges["vision_circuit_open"] = int(self.circuit_breaker.state != CircuitBreaker.CLOSED)
+            counters["vision_circuit_opens_total"] = self.circuit_breaker.opens
+        if isinstance(self.model_client, MultiModalClientPool):
+            counters["vision_pool_hedged_calls_total"] = self.model_client.hedged_calls
+            gauges["vision_pool_outstanding"] = sum(m.outstanding for m in self.model_client.members)
+        return {"gauges": gauges, "counters": counters}
+
+    def _end_flight(self, flight_key: str, flight: asyncio.Future) -> None:
+        self._inflight.pop(flight_key, None)
+        if not flight.cancelled():
+            flight.exception()  # mark retrieved even if every waiter was cancelled
+
+    async def astream_job(self, job: VisionJobRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Run a job while streaming progress as ``(event, data)`` pairs.
+
+        Events: ``token`` (raw model text as it arrives), ``section`` (a top-level
+        key of the output once its value is complete) and finally ``result``
+        (the full ``VisionJobResult``). A cache hit skips straight to sections
+        and the result. Streamed jobs are not coalesced.
+        """
+        # Counted in vision_jobs_total and timed like run_job; a client that
+        # disconnects mid-stream ends the job as an error.
+        with self._job_scope(job):
+            image_bytes = self._decode_image(job)
+            cache_key, cached = await self._acache_lookup(image_bytes)
+            if cached is not None:
+                for key, value in cached.items():
+                    yield "section", {"key": key, "value": value}
+                issues = self._check_schema(job, cached)
+                yield "result", self._build_result(job, cached, schema_issues=issues).model_dump()
+                return
+
+            await self._admit(job)
+            if self.preprocessor is not None:
+                image_bytes = await self.preprocessor.aprocess(image_bytes)
+            members = TopLevelMemberStream()
+            chunks: List[str] = []
+            # Tokens may already have reached the client, so streamed calls are not retried.
+            with self._provider_call(job):
+                async for chunk in self.model_client.astream_model(
+                    image_bytes=image_bytes,
+                    system_prompt=VISION_TO_JSON_SYSTEM_PROMPT,
+                    **timeout_kwargs(self.model_client.astream_model, self.call_timeout),
+                ):
+                    chunks.append(chunk)
+                    yield "token", {"text": chunk}
+                    for key, value in members.feed(chunk):
+                        yield "section", {"key": key, "value": value}
+
+            json_obj, repairs = self._parse_output("".join(chunks))
+            issues = self._check_schema(job, json_obj)
+            await self._aremember(cache_key, json_obj, repairs)
+            yield "result", self._build_result(job, json_obj, repairs, issues).model_dump()
+
+    async def _acall_and_parse(
+        self,
+        job: VisionJobRequest,
+        image_bytes: bytes,
+        cache_key: Optional[str],
+    ) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        await self._admit(job)
+        if self.preprocessor is not None:
+            with self._stage("preprocess", job):
+                image_bytes = await self.preprocessor.aprocess(image_bytes)
+        with self._stage("model", job):
+            raw_output = await self._acall_model(job, image_bytes)
+        with self._stage("parse", job):
+            json_obj, repairs = self._parse_output(raw_output)
+        # Checked once per flight, so coalesced callers share the outcome.
+        with self._stage("validate", job):
+            issues = self._check_schema(job, json_obj)
+            await self._aremember(cache_key, json_obj, repairs)
+        return json_obj, repairs, issues
+
+    async def arun_batch(
+        self,
+        jobs: Sequence[VisionJobRequest],
+        max_concurrency: Optional[int] = None,
+    ) -> List[VisionBatchItem]:
+        """Run many jobs concurrently, at most ``max_concurrency`` model calls at once.
+
+        Results come back in input order. A failing job yields a ``VisionJobError``
+        in its slot rather than aborting the rest of the batch.
+        """
+        limit = min(max_concurrency or self.max_batch_concurrency, self.max_batch_concurrency)
+        semaphore = asyncio.Semaphore(max(1, limit))
+
+        async def _run_one(job: VisionJobRequest) -> VisionBatchItem:
+            async with semaphore:
+                try:
+                    return await self.arun_job(job)
+                except Exception as exc:  # noqa: BLE001
+                    return self._build_error(job, exc)
+
+        return list(await asyncio.gather(*(_run_one(job) for job in jobs)))
+
+    def run_batch(
+        self,
+        jobs: Sequence[VisionJobRequest],
+        max_concurrency: Optional[int] = None,
+    ) -> List[VisionBatchItem]:
+        """Blocking ``arun_batch`` for callers without a running event loop."""
+        return asyncio.run(self.arun_batch(jobs, max_concurrency=max_concurrency))
+
+    @staticmethod
+    def _decode_image(job: VisionJobRequest) -> bytes:
+        if job.image_bytes is not None:
+            return job.image_bytes
+        try:
+            return base64.b64decode(job.image_b64)
+        except Exception as exc:  # noqa: BLE001
+            raise ValueError(f"Invalid base64 image: {exc}") from exc
+
+    def _cache_lookup(self, image_bytes: bytes) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(image_bytes, self.model_client.model_name)
+        return key, self.cache.get(key)
+
+    async def _acache_lookup(self, image_bytes: bytes) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(image_bytes, self.model_client.model_name)
+        return key, await self.cache.aget(key)
+
+    def _parse_output(self, raw_output: str) -> Tuple[Dict[str, Any], List[str]]:
+        try:
+            if self.tolerant_json:
+                json_obj, repairs = extract_json_object(raw_output)
+            else:
+                json_obj, repairs = json_loads(raw_output), []
+        except Exception as exc:  # noqa: BLE001
+            raise ValueError(
+                f"Model did not return valid JSON: {exc}\nOutput was:\n{raw_output}",
+            ) from exc
+        return json_obj, repairs
+
+    def _check_schema(self, job: VisionJobRequest, json_obj: Dict[str, Any]) -> List[str]:
+        if self.schema_validator is None:
+            return []
+        issues = self.schema_validator.validate(json_obj)
+        if issues:
+            if self.metrics is not None:
+                labels = self.metrics.job_labels(job.project, job.context_tags) + (self.schema_mode,)
+                self.metrics.inc("vision_schema_invalid_total", labels)
+            if self.schema_mode == "strict":
+                raise SchemaValidationError(issues)
+        return issues
+
+    def _remember(self, cache_key: Optional[str], json_obj: Dict[str, Any], repairs: Sequence[str]) -> None:
+        # Only reached once strict validation (if any) has passed, so rejected output is never cached.
+        # Truncated output is partial; serve it once but let the next request retry the model.
+        if REPAIR_CLOSED_TRUNCATED in repairs:
+            return
+        if self.cache is not None and cache_key is not None:
+            self.cache.set(cache_key, json_obj)
+
+    async def _aremember(self, cache_key: Optional[str], json_obj: Dict[str, Any], repairs: Sequence[str]) -> None:
+        if REPAIR_CLOSED_TRUNCATED in repairs:
+            return
+        if self.cache is not None and cache_key is not None:
+            await self.cache.aset(cache_key, json_obj)
+
+    @staticmethod
+    def _build_result(
+        job: VisionJobRequest,
+        json_obj: Dict[str, Any],
+        repairs: Sequence[str] = (),
+        schema_issues: Sequence[str] = (),
+    ) -> VisionJobResult:
+        # Fields come from an already-validated job and freshly parsed output, so skip
+        # re-validating (and copying) what can be a very large raw_json payload.
+        return VisionJobResult.model_construct(
+            job_id=job.job_id,
+            success=True,
+            raw_json=json_obj,
+            project=job.project,
+            context_tags=job.context_tags,
+            repairs=list(repairs),
+            schema_issues=list(schema_issues),
+        )
+
+    @staticmethod
+    def _build_error(job: VisionJobRequest, exc: Exception) -> VisionJobError:
+        return VisionJobError(
+            job_id=job.job_id,
+            error=str(exc),
+            project=job.project,
+            context_tags=job.context_tags,
+        )
+
+    def handle_swarm_message(self, envelope: SwarmEnvelope) -> SwarmEnvelope:
+        job = self._swarm_job(envelope)
+        try:
+            result = self.run_job(job)
+        except Exception as exc:  # noqa: BLE001
+            return self.swarm_reply(envelope, "vision.to_json.error", self._build_error(job, exc).model_dump())
+        return self.swarm_reply(envelope, "vision.to_json.response", result.model_dump())
+
+    async def ahandle_swarm_message(self, envelope: SwarmEnvelope) -> SwarmEnvelope:
+        """Async ``handle_swarm_message`` built on ``arun_job``."""
+        job = self._swarm_job(envelope)
+        try:
+            result = await self.arun_job(job)
+        except Exception as exc:  # noqa: BLE001
+            return self.swarm_reply(envelope, "vision.to_json.error", self._build_error(job, exc).model_dump())
+        return self.swarm_reply(envelope, "vision.to_json.response", result.model_dump())
+
+    @staticmethod
+    def _swarm_job(envelope: SwarmEnvelope) -> VisionJobRequest:
+        if envelope.type != "vision.to_json.request":
+            raise ValueError(
+                f"Unsupported message type for VisionStructAgent: {envelope.type}",
+            )
+        return VisionJobRequest(**envelope.payload)
+
+    def swarm_reply(
+        self,
+        envelope: SwarmEnvelope,
+        response_type: SwarmMessageType,
+        payload: Dict[str, Any],
+    ) -> SwarmEnvelope:
+        return SwarmEnvelope(
+            type=response_type,
+            source_agent=self.agent_name,
+            target_agent=envelope.source_agent,
+            payload=payload,
+            correlation_id=envelope.correlation_id or envelope.id,
+            metadata={"origin_type": "vision_struct_swarm_handler", "request_id": envelope.id},
+        )
@@ -0,0 +1,209 @@
+"""Content-addressed result cache: in-memory LRU with an optional SQLite tier."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+
+from .codec import json_dumps, json_loads
+from .prompt import VISION_TO_JSON_SYSTEM_PROMPT_SHA256
+
+# Share of ``max_disk_entries`` kept when the SQLite tier overflows.
+DISK_EVICT_TO = 0.9
+
+
+class VisionResultCache:
+    """Two-tier cache of parsed model output keyed on image, model and prompt.
+
+    The memory tier is an LRU of up to ``max_entries`` items. When ``disk_path`` is
+    set, entries are also written to a SQLite file that survives restarts; rows
+    older than ``ttl_seconds`` are ignored, and once the file holds more than
+    ``max_disk_entries`` rows the least recently used are evicted down to
+    ``DISK_EVICT_TO`` of that limit. Async callers use ``aget``/``aset``, which
+    keep SQLite I/O off the event loop.
+
+    Cached payloads are shared between hits and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_disk_entries: int = 100_000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        # SQLite work has its own lock so memory hits never wait behind disk I/O.
+        self._db_lock = threading.Lock()
+        self._disk_rows = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS vision_results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)",
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS vision_results_accessed ON vision_results (accessed_at)",
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS vision_results_created ON vision_results (created_at)",
+            )
+            (self._disk_rows,) = self._db.execute("SELECT COUNT(*) FROM vision_results").fetchone()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, model_name: str, prompt_sha256: str = VISION_TO_JSON_SYSTEM_PROMPT_SHA256) -> str:
+        image_sha256 = hashlib.sha256(image_bytes).hexdigest()
+        return f"{image_sha256}:{model_name}:{prompt_sha256}"
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._expired(created_at, now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, created_at FROM vision_results WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                return None
+            self._db.execute(
+                "UPDATE vision_results SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+        value = json_loads(row[0])
+        with self._lock:
+            self._remember(key, row[1], value)
+            self.hits += 1
+            self.disk_hits += 1
+        return value
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self._db is not None:
+            value = self._disk_get(key, now)
+        if value is None:
+            self._miss()
+        return value
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """``get`` for event-loop callers: memory hits return inline, SQLite runs on a worker thread."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key, now)
+        if value is None:
+            self._miss()
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+        if self._db is not None:
+            self._disk_set(key, value, now)
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        """``set`` for event-loop callers; the SQLite write runs on a worker thread."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, value, now)
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_set(self, key: str, value: Dict[str, Any], now: float) -> None:
+        encoded = json_dumps(value)
+        with self._db_lock:
+            if self._db is None:
+                return
+            replaced = self._db.execute(
+                "UPDATE vision_results SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                (encoded, now, now, key),
+            ).rowcount
+            if not replaced:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO vision_results (key, value, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, encoded, now, now),
+                )
+                self._disk_rows += 1
+            self._evict_disk(now)
+
+    def _evict_disk(self, now: float) -> None:
+        assert self._db is not None
+        if self.ttl_seconds is not None:
+            self._disk_rows -= self._db.execute(
+                "DELETE FROM vision_results WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            ).rowcount
+        if self._disk_rows <= self.max_disk_entries:
+            return
+        # Other processes may share the file, so recount before evicting.
+        (self._disk_rows,) = self._db.execute("SELECT COUNT(*) FROM vision_results").fetchone()
+        if self._disk_rows > self.max_disk_entries:
+            # Evict below the limit so the recount is paid once per batch of inserts, not on every set.
+            keep = int(self.max_disk_entries * DISK_EVICT_TO)
+            self._disk_rows -= self._db.execute(
+                "DELETE FROM vision_results WHERE key IN ("
+                " SELECT key FROM vision_results ORDER BY accessed_at ASC LIMIT ?)",
+                (self._disk_rows - keep,),
+            ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
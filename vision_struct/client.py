@@ -0,0 +1,325 @@
+"""Multimodal model client interface and the routing/hedging client pool."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+import asyncio
+import functools
+import inspect
+import threading
+import time
+import weakref
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_timeout(func: Any) -> bool:
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    return "timeout" in params or any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values())
+
+
+def timeout_kwargs(method: Any, timeout: Optional[float]) -> Dict[str, float]:
+    """``{"timeout": timeout}`` if a deadline is set and ``method`` accepts it, else ``{}``.
+
+    Adapters written against the original ``call_model(image_bytes, system_prompt)``
+    contract keep working; they just do not get the deadline forwarded.
+    """
+    if timeout is None or not _accepts_timeout(getattr(method, "__func__", method)):
+        return {}
+    return {"timeout": timeout}
+
+
+class MultiModalModelClient:
+    """Abstract adapter over your actual multimodal provider (Gemini, OpenAI, etc.).
+
+    Providers with a native async SDK should override ``acall_model``. Sync-only
+    providers just implement ``call_model``; the default ``acall_model`` runs it on
+    a bounded thread pool so async callers never block the event loop.
+    """
+
+    def __init__(self, model_name: str, max_sync_workers: int = 8):
+        self.model_name = model_name
+        self.max_sync_workers = max_sync_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def call_model(self, image_bytes: bytes, system_prompt: str, timeout: Optional[float] = None) -> str:
+        """Call your multimodal LLM here.
+
+        The returned string MUST be a single JSON object with no markdown wrappers.
+        In production, implement with a multimodal endpoint such as Google Gemini or OpenAI.
+        ``timeout`` is the time left (seconds) before the caller's deadline; it is
+        only passed when a deadline is set, and only to overrides that accept it.
+        Pass it on as the provider SDK's request timeout.
+        """
+        raise NotImplementedError(
+            "Implement MultiModalModelClient.call_model with your provider (Gemini, etc.).",
+        )
+
+    async def acall_model(self, image_bytes: bytes, system_prompt: str, timeout: Optional[float] = None) -> str:
+        """Async variant of ``call_model``.
+
+        The default falls back to ``call_model`` on a thread pool capped at
+        ``max_sync_workers``; excess calls wait for a free thread instead of
+        spawning more.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_sync_workers,
+                thread_name_prefix=f"model-{self.model_name}",
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(
+                self.call_model,
+                image_bytes=image_bytes,
+                system_prompt=system_prompt,
+                **timeout_kwargs(self.call_model, timeout),
+            ),
+        )
+
+    async def astream_model(
+        self,
+        image_bytes: bytes,
+        system_prompt: str,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Yield the model output as it is generated.
+
+        Providers with a streaming API should override this to forward tokens as
+        they arrive; the default yields the whole ``acall_model`` result at once.
+        """
+        yield await self.acall_model(
+            image_bytes=image_bytes,
+            system_prompt=system_prompt,
+            **timeout_kwargs(self.acall_model, timeout),
+        )
+
+    def close(self) -> None:
+        """Release the sync fallback thread pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class _PooledClient:
+    """Routing state for one member of a ``MultiModalClientPool``."""
+
+    def __init__(self, client: MultiModalModelClient, max_concurrency: int):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.sync_slots = threading.BoundedSemaphore(max_concurrency)
+        # asyncio semaphores bind to the first loop that waits on them, so keep one per loop.
+        self._async_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.outstanding = 0
+        self.calls = 0
+        self.errors = 0
+        self.hedge_wins = 0
+
+    def async_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._async_slots.get(loop)
+        if slots is None:
+            slots = self._async_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return slots
+
+
+class MultiModalClientPool(MultiModalModelClient):
+    """Routes calls across several clients/providers behind one client interface.
+
+    Each call goes to the member with the fewest outstanding requests, and no
+    member runs more than ``max_concurrency_per_client`` blocking calls, nor
+    that many async calls per event loop, at once. With
+    ``hedge_percentile`` set (e.g. 95), a call still running after that
+    percentile of recent pool latency is duplicated on a second member and the
+    first successful answer wins; the loser is cancelled.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[MultiModalModelClient],
+        max_concurrency_per_client: int = 4,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 50,
+        latency_window: int = 256,
+        model_name: Optional[str] = None,
+    ):
+        if not clients:
+            raise ValueError("MultiModalClientPool needs at least one client.")
+        super().__init__(model_name or "+".join(c.model_name for c in clients))
+        self.members = [_PooledClient(c, max_concurrency_per_client) for c in clients]
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        self._rotation = 0
+        self.hedged_calls = 0
+
+    def _pick(self, exclude: Optional[_PooledClient] = None) -> _PooledClient:
+        with self._lock:
+            candidates = [m for m in self.members if m is not exclude] or self.members
+            # Rotate the starting point so ties do not always land on the first member.
+            self._rotation = (self._rotation + 1) % len(candidates)
+            ordered = candidates[self._rotation:] + candidates[: self._rotation]
+            member = min(ordered, key=lambda m: m.outstanding)
+            member.outstanding += 1
+            return member
+
+    def _release(self, member: _PooledClient, started: float, failed: bool, cancelled: bool = False) -> None:
+        with self._lock:
+            member.outstanding -= 1
+            member.calls += 1
+            if cancelled:
+                # A cancelled hedge loser says nothing about the member's health or latency.
+                return
+            if failed:
+                member.errors += 1
+            else:
+                self._latencies.append(time.perf_counter() - started)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Latency after which a call is hedged, or None until enough samples exist."""
+        if self.hedge_percentile is None or len(self.members) < 2:
+            return None
+        samples = sorted(self._latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return samples[index]
+
+    def call_model(self, image_bytes: bytes, system_prompt: str, timeout: Optional[float] = None) -> str:
+        """Blocking call routed to the least-loaded member (no hedging).
+
+        Waits for one of the member's ``max_concurrency_per_client`` slots;
+        with ``timeout`` set, that wait counts against it.
+        """
+        member = self._pick()
+        started = time.perf_counter()
+        if not member.sync_slots.acquire(timeout=None if timeout is None else max(0.0, timeout)):
+            self._release(member, started, failed=False, cancelled=True)
+            raise TimeoutError(f"No free slot on {member.client.model_name} within {timeout:.3f}s.")
+        failed = True
+        try:
+            if timeout is not None:
+                timeout = max(0.0, timeout - (time.perf_counter() - started))
+            result = member.client.call_model(
+                image_bytes=image_bytes,
+                system_prompt=system_prompt,
+                **timeout_kwargs(member.client.call_model, timeout),
+            )
+            failed = False
+            return result
+        finally:
+            member.sync_slots.release()
+            self._release(member, started, failed)
+
+    async def _acall_member(
+        self,
+        member: _PooledClient,
+        image_bytes: bytes,
+        system_prompt: str,
+        timeout: Optional[float],
+    ) -> str:
+        started = time.perf_counter()
+        failed = True
+        cancelled = False
+        try:
+            async with member.async_slots():
+                result = await member.client.acall_model(
+                    image_bytes=image_bytes,
+                    system_prompt=system_prompt,
+                    **timeout_kwargs(member.client.acall_model, timeout),
+                )
+            failed = False
+            return result
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            self._release(member, started, failed, cancelled)
+
+    async def acall_model(self, image_bytes: bytes, system_prompt: str, timeout: Optional[float] = None) -> str:
+        primary = self._pick()
+        first = asyncio.ensure_future(self._acall_member(primary, image_bytes, system_prompt, timeout))
+        delay = self.hedge_delay()
+        if delay is None:
+            return await first
+
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            secondary = self._pick(exclude=primary)
+            remaining = None if timeout is None else max(0.0, timeout - delay)
+            second = asyncio.ensure_future(self._acall_member(secondary, image_bytes, system_prompt, remaining))
+            self.hedged_calls += 1
+            owners = {first: primary, second: secondary}
+            pending = {first, second}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            owners[task].hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream_model(
+        self,
+        image_bytes: bytes,
+        system_prompt: str,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Stream from the least-loaded member. Streams are never hedged."""
+        member = self._pick()
+        started = time.perf_counter()
+        failed = True
+        cancelled = False
+        try:
+            async with member.async_slots():
+                async for chunk in member.client.astream_model(
+                    image_bytes=image_bytes,
+                    system_prompt=system_prompt,
+                    **timeout_kwargs(member.client.astream_model, timeout),
+                ):
+                    yield chunk
+            failed = False
+        except (asyncio.CancelledError, GeneratorExit):
+            # The consumer cancelled or stopped reading (e.g. a client disconnect), not a member fault.
+            cancelled = True
+            raise
+        finally:
+            self._release(member, started, failed, cancelled)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedged_calls": self.hedged_calls,
+            "hedge_delay": self.hedge_delay(),
+            "members": [
+                {
+                    "model_name": m.client.model_name,
+                    "outstanding": m.outstanding,
+                    "calls": m.calls,
+                    "errors": m.errors,
+                    "hedge_wins": m.hedge_wins,
+                }
+                for m in self.members
+            ],
+        }
+
+    def close(self) -> None:
+        for member in self.members:
+            member.client.close()
+        super().close()
@@ -0,0 +1,259 @@
+"""JSON codec (orjson, msgspec or stdlib) and tolerant extraction of JSON from model output."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, List, Tuple, Union
+import json
+import re
+
+try:  # Optional fast JSON codecs; the stdlib json module is the fallback.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
+
+
+if orjson is not None:
+    JSON_CODEC = "orjson"
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+elif msgspec is not None:
+    JSON_CODEC = "msgspec"
+    _msgspec_decoder = msgspec.json.Decoder()
+    _msgspec_encoder = msgspec.json.Encoder()
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        try:
+            return _msgspec_decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+    def json_dumps(obj: Any) -> bytes:
+        return _msgspec_encoder.encode(obj)
+
+else:
+    JSON_CODEC = "json"
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+REPAIR_STRIPPED_FENCE = "stripped_markdown_fence"
+REPAIR_SKIPPED_LEADING_TEXT = "skipped_leading_text"
+REPAIR_IGNORED_TRAILING_TEXT = "ignored_trailing_text"
+REPAIR_CLOSED_TRUNCATED = "closed_truncated_json"
+
+_CLOSERS = {"{": "}", "[": "]"}
+_SCALAR_END = set(",}] \t\r\n")
+_WHITESPACE = re.compile(r"[ \t\r\n]+")
+
+
+def _string_end(text: str, i: int) -> int:
+    """Index just past the closing quote of a string whose body starts at ``i``, or -1."""
+    while True:
+        quote = text.find('"', i)
+        if quote == -1:
+            return -1
+        backslashes = 0
+        while text[quote - 1 - backslashes] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return quote + 1
+        i = quote + 1
+
+
+def _scan_json_object(text: str, start: int) -> Tuple[int, Optional[Tuple[int, str]]]:
+    """Find where the JSON object opening at ``text[start]`` ends.
+
+    Returns ``(end, None)`` when the object closes at ``end``. If the text runs
+    out first, returns ``(-1, cut)`` where ``cut`` is ``(index, closers)``: the last
+    point at which a complete member ended, and the brackets that close it.
+    """
+    # Each frame is [opener, expecting]; objects expect key/colon/value/next,
+    # arrays expect value/next. "next" means a member just completed.
+    stack: List[List[str]] = []
+    safe_cut: Optional[Tuple[int, str]] = None
+    i = start
+    length = len(text)
+
+    def closers() -> str:
+        return "".join(_CLOSERS[frame[0]] for frame in reversed(stack))
+
+    while i < length:
+        char = text[i]
+        top = stack[-1] if stack else None
+        if char in " \t\r\n":
+            i = _WHITESPACE.match(text, i).end()
+        elif char == '"':
+            i = _string_end(text, i + 1)
+            if i < 0:
+                break
+            if top is not None and top[0] == "{" and top[1] == "key":
+                top[1] = "colon"
+            elif top is not None:
+                top[1] = "next"
+                safe_cut = (i, closers())
+        elif char in "{[":
+            stack.append([char, "key" if char == "{" else "value"])
+            i += 1
+            safe_cut = (i, closers())
+        elif char in "}]":
+            if not stack or _CLOSERS[stack[-1][0]] != char:
+                return i + 1, None  # mismatched; let the real parser report it
+            stack.pop()
+            i += 1
+            if not stack:
+                return i, None
+            stack[-1][1] = "next"
+            safe_cut = (i, closers())
+        elif char == ":":
+            if top is not None:
+                top[1] = "value"
+            i += 1
+        elif char == ",":
+            if top is not None:
+                top[1] = "key" if top[0] == "{" else "value"
+            i += 1
+        else:
+            while i < length and text[i] not in _SCALAR_END:
+                i += 1
+            if i >= length:
+                break  # a number or literal cut off mid-token is not safe to keep
+            if top is not None:
+                top[1] = "next"
+                safe_cut = (i, closers())
+    return -1, safe_cut
+
+
+class TopLevelMemberStream:
+    """Incrementally splits a streamed JSON object into its top-level members.
+
+    ``feed`` takes the next chunk of model output and returns the ``(key, value)``
+    pairs whose values completed within it, so consumers can act on
+    ``global_context`` while ``objects`` is still streaming. Text before the
+    opening brace (e.g. a markdown fence) is ignored. Total work is linear in
+    the length of the output.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: List[str] = []
+        self._member: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed: List[Tuple[str, Any]] = []
+        if self._done:
+            return completed
+        start = 0
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 0 and char != "{":
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    start = index + 1
+                    self._member = []
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._member.append(chunk[start:index])
+                    completed.extend(self._flush())
+                    self._done = True
+                    return completed
+            elif char == "," and self._depth == 1:
+                self._member.append(chunk[start:index])
+                completed.extend(self._flush())
+                start = index + 1
+        if self._depth > 0:
+            self._member.append(chunk[start:])
+        return completed
+
+    def _flush(self) -> List[Tuple[str, Any]]:
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return []
+        try:
+            member = json_loads("{" + text + "}")
+        except ValueError:
+            return []
+        return list(member.items())
+
+
+def extract_json_object(raw: str) -> Tuple[Dict[str, Any], List[str]]:
+    """Parse the first JSON object in model output, tolerating common wrapping.
+
+    Strict output parses directly. Otherwise the text is scanned once for the
+    first ``{``: markdown fences and prose around the object are dropped, and an
+    object truncated mid-stream is cut back to its last complete member and
+    closed. Returns the object and the repairs applied; raises ``ValueError``
+    if no JSON object can be recovered (including a truncated object with no
+    complete member).
+    """
+    try:
+        parsed = json_loads(raw)
+    except ValueError:
+        parsed = None
+    else:
+        if isinstance(parsed, dict):
+            return parsed, []
+
+    last_error: Optional[Exception] = None
+    start = raw.find("{")
+    while start != -1:
+        end, cut = _scan_json_object(raw, start)
+        repairs: List[str] = []
+        prefix = raw[:start]
+        if "```" in prefix:
+            repairs.append(REPAIR_STRIPPED_FENCE)
+        elif prefix.strip():
+            repairs.append(REPAIR_SKIPPED_LEADING_TEXT)
+
+        if end != -1:
+            candidate = raw[start:end]
+            suffix = raw[end:].strip()
+            if suffix and suffix != "```":
+                repairs.append(REPAIR_IGNORED_TRAILING_TEXT)
+        elif cut is not None:
+            candidate = raw[start : cut[0]] + cut[1]
+            repairs.append(REPAIR_CLOSED_TRUNCATED)
+        else:
+            break
+
+        try:
+            parsed = json_loads(candidate)
+        except ValueError as exc:
+            last_error = exc
+        else:
+            if isinstance(parsed, dict):
+                if parsed or REPAIR_CLOSED_TRUNCATED not in repairs:
+                    return parsed, repairs
+                # A truncation cut back to nothing recovered no data; do not pass off ``{}`` as output.
+                last_error = ValueError("object truncated before its first complete member")
+        start = raw.find("{", start + 1)
+
+    raise ValueError(f"No JSON object found in model output: {last_error or 'no opening brace'}")
@@ -0,0 +1,310 @@
+"""FastAPI HTTP wrapper. Importing this module pulls in the web stack."""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Callable, Dict, Optional, List, Literal
+import asyncio
+import contextlib
+import math
+import time
+
+from fastapi import APIRouter, FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from .agent import VisionStructAgent
+from .client import MultiModalModelClient
+from .codec import json_dumps
+from .metrics import STAGE_TIMINGS, VisionMetrics
+from .ratelimit import AdmissionRejected
+from .resilience import ProviderDeadlineExceeded
+from .schemas import VisionJobRequest, VisionJobResult
+from .settings import VisionServiceSettings, build_agent
+
+
+MAX_BATCH_ITEMS = 500
+# Allowance for multipart boundaries and part headers on top of the file itself.
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+# Send this request header (any value) to get a Server-Timing header with per-stage durations.
+TIMING_REQUEST_HEADER = "x-visionstruct-timing"
+
+
+class VisionJSONResponse(JSONResponse):
+    """JSON response rendered with the fast codec, bypassing response_model re-validation."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def _vision_response(result: VisionJobResult) -> VisionJSONResponse:
+    headers = {}
+    if result.repairs:
+        headers["X-VisionStruct-Repairs"] = ",".join(result.repairs)
+    if result.schema_issues:
+        headers["X-VisionStruct-Schema-Issues"] = str(len(result.schema_issues))
+    return VisionJSONResponse({"job_id": result.job_id, "data": result.raw_json}, headers=headers or None)
+
+
+def _job_error_status(exc: Exception) -> int:
+    if isinstance(exc, AdmissionRejected):
+        return exc.status_code
+    if isinstance(exc, ProviderDeadlineExceeded):
+        return 504
+    return 500 if isinstance(exc, NotImplementedError) else 400
+
+
+def _job_http_error(exc: Exception) -> HTTPException:
+    headers = None
+    if isinstance(exc, AdmissionRejected):
+        headers = {"Retry-After": str(math.ceil(exc.retry_after))}
+    return HTTPException(status_code=_job_error_status(exc), detail=str(exc), headers=headers)
+
+
+async def _stream_events(
+    agent: VisionStructAgent,
+    job: VisionJobRequest,
+    fmt: str,
+    include_tokens: bool,
+) -> AsyncIterator[bytes]:
+    try:
+        async for event, data in agent.astream_job(job):
+            if event == "token" and not include_tokens:
+                continue
+            if fmt == "ndjson":
+                yield json_dumps({"event": event, "data": data}) + b"\n"
+            else:
+                yield b"event: " + event.encode("utf-8") + b"\ndata: " + json_dumps(data) + b"\n\n"
+    except Exception as exc:  # noqa: BLE001
+        status = _job_error_status(exc)
+        data = {"job_id": job.job_id, "status_code": status, "detail": str(exc)}
+        if isinstance(exc, AdmissionRejected):
+            data["retry_after"] = math.ceil(exc.retry_after)
+        if fmt == "ndjson":
+            yield json_dumps({"event": "error", "data": data}) + b"\n"
+        else:
+            yield b"event: error\ndata: " + json_dumps(data) + b"\n\n"
+
+
+async def reject_oversized_uploads(request: Request, call_next):
+    if request.url.path == "/vision-to-json/upload":
+        max_bytes = request.app.state.max_upload_bytes
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > max_bytes + UPLOAD_FORM_OVERHEAD_BYTES:
+                return JSONResponse(
+                    status_code=413,
+                    content={"detail": f"Upload exceeds {max_bytes} bytes."},
+                )
+    return await call_next(request)
+
+
+async def record_request_metrics(request: Request, call_next):
+    metrics: VisionMetrics = request.app.state.vision_metrics
+    # Unknown paths share one label to bound cardinality.
+    path = request.url.path if request.url.path in request.app.state.route_paths else "other"
+    want_timing = TIMING_REQUEST_HEADER in request.headers
+    token = STAGE_TIMINGS.set({} if want_timing else None)
+    metrics.inc("vision_http_in_flight", (path,))
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        metrics.inc("vision_http_in_flight", (path,), -1)
+        metrics.observe("vision_http_request_seconds", (path,), time.perf_counter() - started)
+        metrics.inc("vision_http_requests_total", (path, str(status)))
+        timings = STAGE_TIMINGS.get()
+        STAGE_TIMINGS.reset(token)
+    if timings:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items()
+        )
+    return response
+
+
+async def _read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """Read a spooled upload straight into one preallocated buffer, never more than ``max_bytes``.
+
+    The buffer is sized from the part's length when known (one byte over the
+    limit otherwise, to detect oversized bodies), and the spooled file is read
+    into it on a worker thread, so no per-chunk copies are kept around.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes.")
+
+    buffer = bytearray(max_bytes + 1 if file.size is None else file.size)
+    total = 0
+    with memoryview(buffer) as view:
+        while total < len(buffer):
+            read = await asyncio.to_thread(file.file.readinto, view[total:])
+            if not read:
+                break
+            total += read
+    if total > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes.")
+    del buffer[total:]
+    return bytes(buffer)
+
+
+class HttpVisionRequest(BaseModel):
+    image_b64: str
+    project: Optional[str] = None
+    context_tags: Optional[List[str]] = None
+
+
+class HttpVisionResponse(BaseModel):
+    job_id: str
+    data: Dict[str, Any]
+
+
+class HttpVisionBatchRequest(BaseModel):
+    items: List[HttpVisionRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Per-request cap on concurrent model calls; never exceeds the server limit.",
+    )
+
+
+class HttpVisionBatchItem(BaseModel):
+    job_id: str
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class HttpVisionBatchResponse(BaseModel):
+    results: List[HttpVisionBatchItem]
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(request: Request):
+    agent: VisionStructAgent = request.app.state.vision_agent
+    snapshot = agent.metrics_snapshot()
+    return PlainTextResponse(
+        request.app.state.vision_metrics.render(snapshot["gauges"], snapshot["counters"]),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.post("/vision-to-json", response_model=HttpVisionResponse)
+async def vision_to_json_http_endpoint(body: HttpVisionRequest, request: Request):
+    job = VisionJobRequest(
+        image_b64=body.image_b64,
+        project=body.project,
+        context_tags=body.context_tags,
+    )
+
+    try:
+        result = await request.app.state.vision_agent.arun_job(job)
+    except Exception as exc:  # noqa: BLE001
+        raise _job_http_error(exc) from exc
+
+    return _vision_response(result)
+
+
+@router.post("/vision-to-json/stream")
+async def vision_to_json_stream(
+    body: HttpVisionRequest,
+    request: Request,
+    format: Literal["sse", "ndjson"] = "sse",
+    include_tokens: bool = True,
+):
+    """Stream a job as Server-Sent Events (default) or newline-delimited JSON.
+
+    Emits ``token`` events with raw model text, ``section`` events as each
+    top-level key completes, then one ``result`` event with the validated
+    ``VisionJobResult`` (or an ``error`` event).
+    """
+    job = VisionJobRequest(
+        image_b64=body.image_b64,
+        project=body.project,
+        context_tags=body.context_tags,
+    )
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        _stream_events(request.app.state.vision_agent, job, format, include_tokens),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/vision-to-json/upload", response_model=HttpVisionResponse)
+async def vision_to_json_upload(request: Request, file: UploadFile = File(...), project: Optional[str] = None):
+    try:
+        content = await _read_upload(file, request.app.state.max_upload_bytes)
+    except HTTPException:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail=f"Failed to read file: {exc}") from exc
+    finally:
+        await file.close()
+
+    job = VisionJobRequest(image_bytes=content, project=project)
+    try:
+        result = await request.app.state.vision_agent.arun_job(job)
+    except Exception as exc:  # noqa: BLE001
+        raise _job_http_error(exc) from exc
+
+    return _vision_response(result)
+
+
+@router.post("/vision-to-json/batch", response_model=HttpVisionBatchResponse)
+async def vision_to_json_batch(body: HttpVisionBatchRequest, request: Request):
+    jobs = [
+        VisionJobRequest(
+            image_b64=item.image_b64,
+            project=item.project,
+            context_tags=item.context_tags,
+        )
+        for item in body.items
+    ]
+    agent: VisionStructAgent = request.app.state.vision_agent
+    results = await agent.arun_batch(jobs, max_concurrency=body.max_concurrency)
+
+    return VisionJSONResponse(
+        {
+            "results": [
+                {"job_id": r.job_id, "success": True, "data": r.raw_json, "error": None}
+                if isinstance(r, VisionJobResult)
+                else {"job_id": r.job_id, "success": False, "data": None, "error": r.error}
+                for r in results
+            ],
+        },
+    )
+
+
+def create_app(
+    settings: Optional[VisionServiceSettings] = None,
+    model_client_factory: Optional[Callable[[], MultiModalModelClient]] = None,
+) -> FastAPI:
+    """Build the HTTP app. The model client and agent are created in the lifespan
+    hook, once per worker process, rather than at import time."""
+    settings = settings or VisionServiceSettings.from_env()
+    metrics = VisionMetrics()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        client = model_client_factory() if model_client_factory else None
+        agent = build_agent(settings, model_client=client, metrics=metrics)
+        app.state.vision_agent = agent
+        try:
+            yield
+        finally:
+            agent.close()
+
+    app = FastAPI(title="VisionStruct Agent API", version="1.0.0", lifespan=lifespan)
+    app.include_router(router)
+    app.state.vision_metrics = metrics
+    app.state.max_upload_bytes = settings.max_upload_bytes
+    app.state.route_paths = frozenset(getattr(route, "path", "") for route in app.routes)
+    app.middleware("http")(reject_oversized_uploads)
+    app.middleware("http")(record_request_metrics)
+    return app
+
+
+app = create_app()
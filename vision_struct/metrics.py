@@ -0,0 +1,125 @@
+"""Prometheus metrics registry and per-request stage timing."""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, List, Sequence, Set, Tuple
+import threading
+
+
+# Label value that project / context_tags values past the cardinality cap are folded into.
+OVERFLOW_LABEL = "other"
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Per-request stage durations (seconds), collected when a caller opts in.
+STAGE_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar("vision_stage_timings", default=None)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class VisionMetrics:
+    """Minimal thread-safe Prometheus registry for the VisionStruct agent and API.
+
+    Counters, gauges and histograms are keyed by label values and rendered in
+    the Prometheus text exposition format by ``render``. Project and
+    context_tags come from callers, so only the first ``max_projects`` /
+    ``max_context_tags`` distinct values get their own series; later ones
+    are reported as ``"other"``.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        max_projects: int = 256,
+        max_context_tags: int = 256,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.max_projects = max_projects
+        self.max_context_tags = max_context_tags
+        self._lock = threading.Lock()
+        self._projects: Set[str] = set()
+        self._context_tags: Set[str] = set()
+        self._meta: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        self._values: Dict[str, Dict[Tuple[str, ...], Any]] = {}
+        self._declare("vision_jobs_total", "counter", "Vision jobs by outcome.", ("project", "context_tags", "outcome"))
+        self._declare("vision_stage_seconds", "histogram", "Time spent per job stage.", ("stage", "project", "context_tags"))
+        self._declare("vision_provider_errors_total", "counter", "Failed model provider calls.", ("model", "project", "context_tags"))
+        self._declare("vision_schema_invalid_total", "counter", "Model outputs that failed schema validation.", ("project", "context_tags", "mode"))
+        self._declare("vision_provider_retries_total", "counter", "Model calls retried after a transient error.", ("model",))
+        self._declare("vision_admission_rejected_total", "counter", "Model calls shed by rate limiting.", ("scope", "project"))
+        self._declare("vision_http_requests_total", "counter", "HTTP requests by path and status.", ("path", "status"))
+        self._declare("vision_http_request_seconds", "histogram", "HTTP request latency.", ("path",))
+        self._declare("vision_http_in_flight", "gauge", "HTTP requests currently being served.", ("path",))
+
+    def _declare(self, name: str, kind: str, help_text: str, labels: Tuple[str, ...]) -> None:
+        self._meta[name] = (kind, help_text, labels)
+        self._values[name] = {}
+
+    def _bounded(self, seen: Set[str], value: str, limit: int) -> str:
+        if not value:
+            return value
+        with self._lock:
+            if value in seen:
+                return value
+            if len(seen) < limit:
+                seen.add(value)
+                return value
+        return OVERFLOW_LABEL
+
+    def project_label(self, project: Optional[str]) -> str:
+        return self._bounded(self._projects, project or "", self.max_projects)
+
+    def job_labels(self, project: Optional[str], context_tags: Optional[List[str]]) -> Tuple[str, str]:
+        tags = ",".join(sorted(context_tags or ()))
+        return self.project_label(project), self._bounded(self._context_tags, tags, self.max_context_tags)
+
+    def inc(self, name: str, labels: Tuple[str, ...], amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._values[name]
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def observe(self, name: str, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._values[name]
+            state = series.get(labels)
+            if state is None:
+                state = series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(
+        self,
+        extra_gauges: Optional[Dict[str, float]] = None,
+        extra_counters: Optional[Dict[str, float]] = None,
+    ) -> str:
+        """Text exposition of the registry plus unlabelled values sampled elsewhere (e.g. ``metrics_snapshot``)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, state in self._values[name].items():
+                    pairs = [f'{k}="{_escape_label(v)}"' for k, v in zip(label_names, labels)]
+                    if kind != "histogram":
+                        series_labels = ",".join(pairs)
+                        lines.append(f"{name}{{{series_labels}}} {state}")
+                        continue
+                    for bound, count in zip(self.buckets, state[0]):
+                        bucket_labels = ",".join(pairs + [f'le="{bound}"'])
+                        lines.append(f"{name}_bucket{{{bucket_labels}}} {count}")
+                    inf_labels = ",".join(pairs + ['le="+Inf"'])
+                    series_labels = ",".join(pairs)
+                    lines.append(f"{name}_bucket{{{inf_labels}}} {state[2]}")
+                    lines.append(f"{name}_sum{{{series_labels}}} {state[1]}")
+                    lines.append(f"{name}_count{{{series_labels}}} {state[2]}")
+        for kind, extra in (("gauge", extra_gauges), ("counter", extra_counters)):
+            for name, value in (extra or {}).items():
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,112 @@
+"""Optional image pre-processing (downscale and re-encode) before model calls."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import asyncio
+import hashlib
+import io
+import threading
+
+try:  # Optional; only needed for the image pre-processing stage.
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+    ImageOps = None
+
+
+def normalize_image_bytes(image_bytes: bytes, max_edge: int, image_format: str, quality: int) -> bytes:
+    """Downscale to ``max_edge``, apply EXIF orientation, drop metadata and re-encode.
+
+    Module-level so it can run in a process pool. The re-encoded bytes are
+    always returned, even when larger than the input, so location and device
+    metadata never reach the provider.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        image = ImageOps.exif_transpose(source)
+        if max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if image_format.upper() == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        out = io.BytesIO()
+        # Nothing from source.info (EXIF, ICC, XMP, text chunks) is passed on.
+        image.save(out, format=image_format, quality=quality, optimize=True)
+    return out.getvalue()
+
+
+class ImagePreprocessor:
+    """Shrinks images before they are sent to the model provider.
+
+    Work runs in a process pool of ``processes`` workers so large decodes do not
+    block the event loop, and outputs are kept in an LRU of ``cache_entries``
+    keyed on the sha256 of the input bytes. Requires Pillow.
+    """
+
+    def __init__(
+        self,
+        max_edge: int = 2048,
+        image_format: str = "WEBP",
+        quality: int = 85,
+        processes: Optional[int] = None,
+        cache_entries: int = 64,
+    ):
+        if Image is None:
+            raise RuntimeError("ImagePreprocessor requires Pillow (pip install pillow).")
+        self.max_edge = max_edge
+        self.image_format = image_format
+        self.quality = quality
+        self.processes = processes
+        self.cache_entries = cache_entries
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _cached(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _remember(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def process(self, image_bytes: bytes) -> bytes:
+        key = hashlib.sha256(image_bytes).hexdigest()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        result = normalize_image_bytes(image_bytes, self.max_edge, self.image_format, self.quality)
+        self._remember(key, result)
+        return result
+
+    async def aprocess(self, image_bytes: bytes) -> bytes:
+        key = hashlib.sha256(image_bytes).hexdigest()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._pool,
+            normalize_image_bytes,
+            image_bytes,
+            self.max_edge,
+            self.image_format,
+            self.quality,
+        )
+        self._remember(key, result)
+        return result
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,161 @@
+"""Token-bucket rate limiting and admission control in front of the model client."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, List, Tuple
+import asyncio
+import threading
+import time
+
+
+class AdmissionRejected(RuntimeError):
+    """A model call was shed because its rate-limit wait queue is full.
+
+    ``status_code`` is 429 when a project exceeded its own quota and 503 when
+    the shared provider quota is saturated; ``retry_after`` is the estimated
+    wait in seconds before a retry would be admitted.
+    """
+
+    def __init__(self, scope: str, key: str, retry_after: float, message: Optional[str] = None):
+        super().__init__(message or f"Rate limit exceeded for {scope} {key!r}; retry in {retry_after:.1f}s.")
+        self.scope = scope
+        self.key = key
+        self.retry_after = retry_after
+        self.status_code = 429 if scope == "project" else 503
+
+
+class TokenBucket:
+    """``rate`` calls per second sustained, up to ``burst`` at once.
+
+    Callers reserve a token up front and sleep for the returned delay, so
+    waiters are released in arrival order at exactly the bucket rate.
+    Not thread-safe on its own; ``VisionRateLimiter`` serialises access.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until the next reservation would hold a token."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return max(0.0, (1.0 - self._tokens) / self.rate)
+
+    def take(self) -> None:
+        self._tokens -= 1.0
+
+    def refund(self) -> None:
+        self._tokens += 1.0
+
+
+class VisionRateLimiter:
+    """Admission control in front of the model client.
+
+    Every model call reserves a token from its provider bucket (keyed by
+    model name) and, when ``project_rate`` is set, from its project bucket.
+    Calls that must wait join a bounded queue; once ``max_queue`` calls are
+    waiting, or the wait would exceed ``max_wait_seconds``, new calls are
+    rejected immediately with ``AdmissionRejected`` instead of piling up.
+    """
+
+    def __init__(
+        self,
+        provider_rate: Optional[float] = None,
+        provider_burst: Optional[float] = None,
+        project_rate: Optional[float] = None,
+        project_burst: Optional[float] = None,
+        project_rates: Optional[Dict[str, float]] = None,
+        max_queue: int = 64,
+        max_wait_seconds: float = 10.0,
+        max_projects: int = 1024,
+    ):
+        self.provider_rate = provider_rate
+        self.provider_burst = provider_burst
+        self.project_rate = project_rate
+        self.project_burst = project_burst
+        self.project_rates = dict(project_rates or {})
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.max_projects = max_projects
+        self._lock = threading.Lock()
+        self._providers: Dict[str, TokenBucket] = {}
+        # Project names come from callers, so keep only the most recently used buckets.
+        self._projects: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def _buckets(self, provider: str, project: Optional[str]) -> List[Tuple[str, str, TokenBucket]]:
+        buckets: List[Tuple[str, str, TokenBucket]] = []
+        if self.provider_rate:
+            bucket = self._providers.get(provider)
+            if bucket is None:
+                bucket = self._providers[provider] = TokenBucket(self.provider_rate, self.provider_burst)
+            buckets.append(("provider", provider, bucket))
+        key = project or ""
+        rate = self.project_rates.get(key, self.project_rate)
+        if rate:
+            bucket = self._projects.get(key)
+            if bucket is None:
+                bucket = self._projects[key] = TokenBucket(rate, self.project_burst)
+                if len(self._projects) > self.max_projects:
+                    self._projects.popitem(last=False)
+            else:
+                self._projects.move_to_end(key)
+            buckets.append(("project", key, bucket))
+        return buckets
+
+    def _reserve(self, provider: str, project: Optional[str]) -> Tuple[float, List[TokenBucket]]:
+        with self._lock:
+            now = time.monotonic()
+            buckets = self._buckets(provider, project)
+            delays = [(bucket.delay(now), scope, key) for scope, key, bucket in buckets]
+            wait, scope, key = max(delays, default=(0.0, "", ""))
+            if wait > 0 and (self.waiting >= self.max_queue or wait > self.max_wait_seconds):
+                self.rejected += 1
+                raise AdmissionRejected(scope, key, retry_after=wait)
+            for _, _, bucket in buckets:
+                bucket.take()
+            self.admitted += 1
+            if wait > 0:
+                self.waiting += 1
+            return wait, [bucket for _, _, bucket in buckets]
+
+    def _leave_queue(self, taken: List[TokenBucket], refund: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if refund:
+                for bucket in taken:
+                    bucket.refund()
+
+    async def acquire(self, provider: str, project: Optional[str] = None) -> float:
+        """Wait for a slot; returns the time spent queued. Raises ``AdmissionRejected``."""
+        wait, taken = self._reserve(provider, project)
+        if wait > 0:
+            refund = True
+            try:
+                await asyncio.sleep(wait)
+                refund = False
+            finally:
+                self._leave_queue(taken, refund)
+        return wait
+
+    def acquire_sync(self, provider: str, project: Optional[str] = None) -> float:
+        """Blocking ``acquire`` for ``run_job`` and other synchronous callers."""
+        wait, taken = self._reserve(provider, project)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._leave_queue(taken, refund=False)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"waiting": self.waiting, "admitted": self.admitted, "rejected": self.rejected}
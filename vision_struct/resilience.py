@@ -0,0 +1,116 @@
+"""Provider-call resilience: retries with backoff, circuit breaking and deadlines."""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+import random
+import threading
+import time
+
+from .ratelimit import AdmissionRejected
+
+
+class ProviderDeadlineExceeded(TimeoutError):
+    """The model call (including retries) did not finish within its deadline."""
+
+
+class CircuitOpenError(AdmissionRejected):
+    """The provider's circuit breaker is open; the call was not attempted."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(
+            "circuit",
+            provider,
+            retry_after,
+            message=f"Provider {provider!r} is failing; circuit open, retry in {retry_after:.1f}s.",
+        )
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter between attempts of one model call.
+
+    After failed attempt ``n`` the next attempt waits a random time in
+    ``[0, min(max_delay, base_delay * 2 ** (n - 1))]``. ``retryable`` decides
+    which errors are transient; by default everything except caller errors,
+    shed calls and exhausted deadlines is retried.
+    """
+
+    NON_RETRYABLE = (NotImplementedError, ValueError, TypeError, AdmissionRejected, ProviderDeadlineExceeded)
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        retryable: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+
+    def is_transient(self, exc: Exception) -> bool:
+        """Whether ``exc`` is a provider fault worth retrying (and counting against the circuit)."""
+        if self.retryable is not None:
+            return self.retryable(exc)
+        return not isinstance(exc, self.NON_RETRYABLE)
+
+    def should_retry(self, exc: Exception, attempt: int) -> bool:
+        return attempt < self.max_attempts and self.is_transient(exc)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails fast once a provider has failed ``failure_threshold`` times in a row.
+
+    While open, calls raise ``CircuitOpenError`` without reaching the provider.
+    After ``recovery_seconds`` a single trial call is let through (half-open):
+    success closes the circuit, failure re-opens it for another period. Only
+    transient provider faults count as failures; caller errors are recorded
+    as abandoned calls and leave the circuit as it was.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str = "", failure_threshold: int = 5, recovery_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._opened_at = 0.0
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self.state == self.OPEN and waited >= self.recovery_seconds:
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(self.name, max(0.0, self.recovery_seconds - waited))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opens += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """A call was cancelled before it finished; let the next caller run the trial."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic() - self.recovery_seconds
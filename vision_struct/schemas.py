@@ -0,0 +1,82 @@
+"""Swarm envelope and Vision-to-JSON job schemas."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, List, Literal, Union
+import uuid
+
+from pydantic import BaseModel, Field, model_validator
+
+
+SwarmMessageType = Literal[
+    "vision.to_json.request",
+    "vision.to_json.response",
+    "vision.to_json.error",
+]
+
+
+class VisionJobRequest(BaseModel):
+    job_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    image_b64: Optional[str] = Field(
+        default=None,
+        description="Base64-encoded image bytes (PNG/JPEG/etc). Used by JSON callers and the Swarm bus.",
+    )
+    image_bytes: Optional[bytes] = Field(
+        default=None,
+        exclude=True,
+        repr=False,
+        description="Raw image bytes for in-process callers; passed to the model as-is and never serialized.",
+    )
+    project: Optional[str] = Field(
+        default=None,
+        description="Project label (e.g., 'WIRED_CHAOS_META', 'VAULT_33', 'NEURO_UNIVERSE').",
+    )
+    context_tags: Optional[List[str]] = Field(
+        default=None,
+        description="Arbitrary tags (e.g., ['thumbnail', 'nft_trait_extraction']).",
+    )
+
+    @model_validator(mode="after")
+    def _require_image(self) -> "VisionJobRequest":
+        if self.image_b64 is None and self.image_bytes is None:
+            raise ValueError("One of image_b64 or image_bytes is required.")
+        return self
+
+
+class VisionJobResult(BaseModel):
+    job_id: str
+    success: bool
+    raw_json: Dict[str, Any]
+    project: Optional[str] = None
+    context_tags: Optional[List[str]] = None
+    repairs: List[str] = Field(
+        default_factory=list,
+        description="Fixes applied to the model output before parsing (fences stripped, etc.).",
+    )
+    schema_issues: List[str] = Field(
+        default_factory=list,
+        description="Schema problems found in report-only validation mode (missing keys, wrong shapes).",
+    )
+
+
+class VisionJobError(BaseModel):
+    job_id: str
+    success: bool = False
+    error: str
+    project: Optional[str] = None
+    context_tags: Optional[List[str]] = None
+
+
+VisionBatchItem = Union[VisionJobResult, VisionJobError]
+
+
+class SwarmEnvelope(BaseModel):
+    """Generic envelope for messages moving through your Swarm bus."""
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    type: SwarmMessageType
+    source_agent: str
+    target_agent: str
+    payload: Dict[str, Any]
+    correlation_id: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
@@ -0,0 +1,181 @@
+"""Service settings from the environment and agent construction."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal, Optional
+import importlib
+import os
+
+from pydantic import BaseModel, Field
+
+from .agent import VisionStructAgent
+from .cache import VisionResultCache
+from .client import MultiModalModelClient
+from .metrics import VisionMetrics
+from .ratelimit import VisionRateLimiter
+from .resilience import CircuitBreaker, RetryPolicy
+from .validation import prompt_schema_validator
+
+if TYPE_CHECKING:
+    from .preprocess import ImagePreprocessor
+
+
+class VisionServiceSettings(BaseModel):
+    """Per-process service configuration, read from ``VISION_*`` environment variables."""
+
+    model_name: str = "YOUR_MODEL_NAME"
+    model_client_factory: Optional[str] = Field(
+        default=None,
+        description="'module:callable' returning a MultiModalModelClient; built once per worker.",
+    )
+    cache_entries: int = 1024
+    cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite result cache shared by every worker on the node.",
+    )
+    cache_ttl_seconds: Optional[float] = None
+    max_batch_concurrency: int = 8
+    provider_rps: Optional[float] = Field(default=None, description="Provider quota for the whole node, calls/second.")
+    provider_burst: Optional[float] = None
+    project_rps: Optional[float] = Field(default=None, description="Per-project quota for the whole node, calls/second.")
+    project_burst: Optional[float] = None
+    admission_queue: int = 64
+    admission_max_wait_seconds: float = 10.0
+    retry_attempts: int = 3
+    retry_base_delay: float = 0.2
+    retry_max_delay: float = 5.0
+    call_timeout_seconds: Optional[float] = Field(default=None, description="Deadline for a job's model call, retries included.")
+    breaker_failures: int = Field(default=5, description="Consecutive provider failures that open the circuit; 0 disables it.")
+    breaker_recovery_seconds: float = 30.0
+    schema_validation: Literal["off", "report", "strict"] = "report"
+    preprocess_max_edge: Optional[int] = Field(
+        default=None,
+        description="Downscale images so the longest edge is at most this many pixels before the model call; unset disables (needs Pillow).",
+    )
+    preprocess_format: str = "WEBP"
+    preprocess_quality: int = 85
+    preprocess_processes: Optional[int] = Field(default=None, description="Pre-processing process pool size; defaults to the CPU count.")
+    max_upload_bytes: int = Field(
+        default=20 * 1024 * 1024,
+        description="Largest accepted file upload; bigger bodies are refused with 413 before they are read.",
+    )
+    workers: int = Field(default=1, description="Worker processes sharing the node quotas; set by the CLI.")
+
+    @classmethod
+    def from_env(cls) -> "VisionServiceSettings":
+        env = os.environ
+        ttl = env.get("VISION_CACHE_TTL_SECONDS")
+
+        def _float(name: str) -> Optional[float]:
+            value = env.get(name)
+            return float(value) if value else None
+
+        def _int(name: str) -> Optional[int]:
+            value = env.get(name)
+            return int(value) if value else None
+
+        return cls(
+            model_name=env.get("VISION_MODEL_NAME", "YOUR_MODEL_NAME"),
+            model_client_factory=env.get("VISION_MODEL_CLIENT_FACTORY") or None,
+            cache_entries=int(env.get("VISION_CACHE_ENTRIES", "1024")),
+            cache_path=env.get("VISION_CACHE_PATH") or None,
+            cache_ttl_seconds=float(ttl) if ttl else None,
+            max_batch_concurrency=int(env.get("VISION_BATCH_CONCURRENCY", "8")),
+            provider_rps=_float("VISION_PROVIDER_RPS"),
+            provider_burst=_float("VISION_PROVIDER_BURST"),
+            project_rps=_float("VISION_PROJECT_RPS"),
+            project_burst=_float("VISION_PROJECT_BURST"),
+            admission_queue=int(env.get("VISION_ADMISSION_QUEUE", "64")),
+            admission_max_wait_seconds=float(env.get("VISION_ADMISSION_MAX_WAIT_SECONDS", "10")),
+            retry_attempts=int(env.get("VISION_RETRY_ATTEMPTS", "3")),
+            retry_base_delay=float(env.get("VISION_RETRY_BASE_DELAY", "0.2")),
+            retry_max_delay=float(env.get("VISION_RETRY_MAX_DELAY", "5")),
+            call_timeout_seconds=_float("VISION_CALL_TIMEOUT_SECONDS"),
+            breaker_failures=int(env.get("VISION_BREAKER_FAILURES", "5")),
+            breaker_recovery_seconds=float(env.get("VISION_BREAKER_RECOVERY_SECONDS", "30")),
+            schema_validation=env.get("VISION_SCHEMA_VALIDATION", "report"),
+            preprocess_max_edge=_int("VISION_PREPROCESS_MAX_EDGE"),
+            preprocess_format=env.get("VISION_PREPROCESS_FORMAT", "WEBP"),
+            preprocess_quality=int(env.get("VISION_PREPROCESS_QUALITY", "85")),
+            preprocess_processes=_int("VISION_PREPROCESS_PROCESSES"),
+            max_upload_bytes=int(env.get("VISION_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024))),
+            workers=int(env.get("VISION_WORKERS", "1")),
+        )
+
+
+def load_model_client(settings: VisionServiceSettings) -> MultiModalModelClient:
+    if settings.model_client_factory:
+        module_name, _, attr = settings.model_client_factory.partition(":")
+        factory = getattr(importlib.import_module(module_name), attr)
+        return factory()
+    return MultiModalModelClient(model_name=settings.model_name)
+
+
+def build_rate_limiter(settings: VisionServiceSettings) -> Optional[VisionRateLimiter]:
+    """Per-process limiter; node-wide quotas are split evenly across the workers."""
+    if not settings.provider_rps and not settings.project_rps:
+        return None
+    workers = max(1, settings.workers)
+
+    def _share(value: Optional[float]) -> Optional[float]:
+        return value / workers if value else None
+
+    return VisionRateLimiter(
+        provider_rate=_share(settings.provider_rps),
+        provider_burst=_share(settings.provider_burst),
+        project_rate=_share(settings.project_rps),
+        project_burst=_share(settings.project_burst),
+        max_queue=settings.admission_queue,
+        max_wait_seconds=settings.admission_max_wait_seconds,
+    )
+
+
+def build_preprocessor(settings: VisionServiceSettings) -> Optional["ImagePreprocessor"]:
+    if not settings.preprocess_max_edge:
+        return None
+    # Imported here so Pillow is only needed when pre-processing is configured.
+    from .preprocess import ImagePreprocessor
+
+    return ImagePreprocessor(
+        max_edge=settings.preprocess_max_edge,
+        image_format=settings.preprocess_format,
+        quality=settings.preprocess_quality,
+        processes=settings.preprocess_processes,
+    )
+
+
+def build_agent(
+    settings: VisionServiceSettings,
+    model_client: Optional[MultiModalModelClient] = None,
+    metrics: Optional[VisionMetrics] = None,
+) -> VisionStructAgent:
+    cache = VisionResultCache(
+        max_entries=settings.cache_entries,
+        disk_path=settings.cache_path,
+        ttl_seconds=settings.cache_ttl_seconds,
+    )
+    model_client = model_client or load_model_client(settings)
+    breaker = None
+    if settings.breaker_failures > 0:
+        breaker = CircuitBreaker(
+            name=model_client.model_name,
+            failure_threshold=settings.breaker_failures,
+            recovery_seconds=settings.breaker_recovery_seconds,
+        )
+    return VisionStructAgent(
+        model_client=model_client,
+        max_batch_concurrency=settings.max_batch_concurrency,
+        cache=cache,
+        metrics=metrics,
+        rate_limiter=build_rate_limiter(settings),
+        retry_policy=RetryPolicy(
+            max_attempts=settings.retry_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+        ),
+        circuit_breaker=breaker,
+        call_timeout=settings.call_timeout_seconds,
+        schema_validator=None if settings.schema_validation == "off" else prompt_schema_validator(),
+        schema_mode="strict" if settings.schema_validation == "strict" else "report",
+        preprocessor=build_preprocessor(settings),
+    )
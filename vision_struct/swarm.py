@@ -0,0 +1,283 @@
+"""Swarm bus worker runtime: transports and the envelope-processing worker."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional
+import asyncio
+import contextlib
+import os
+import signal
+import time
+
+from .schemas import SwarmEnvelope
+
+if TYPE_CHECKING:
+    from .agent import VisionStructAgent
+
+
+# Largest single NDJSON envelope accepted by the socket transport (base64 images included).
+MAX_ENVELOPE_BYTES = 64 * 1024 * 1024
+
+
+class SwarmTransport:
+    """Where a ``SwarmWorker`` gets request envelopes and sends responses."""
+
+    async def receive(self) -> Optional[SwarmEnvelope]:
+        """Next request envelope, or None once the transport is closed and empty."""
+        raise NotImplementedError
+
+    async def publish(self, envelope: SwarmEnvelope) -> None:
+        raise NotImplementedError
+
+    def take_pending(self) -> List[SwarmEnvelope]:
+        """Remove and return every envelope received but not yet handed out (used at shutdown)."""
+        return []
+
+    async def close(self) -> None:
+        pass
+
+
+def _take_queued(queue: asyncio.Queue) -> List[SwarmEnvelope]:
+    taken = []
+    while not queue.empty():
+        envelope = queue.get_nowait()
+        if envelope is not None:
+            taken.append(envelope)
+    return taken
+
+
+class AsyncioQueueTransport(SwarmTransport):
+    """In-process bus. Producers block on ``submit`` while the inbox is full."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.outbox: asyncio.Queue = asyncio.Queue()
+
+    async def submit(self, envelope: SwarmEnvelope) -> None:
+        await self.inbox.put(envelope)
+
+    async def receive(self) -> Optional[SwarmEnvelope]:
+        return await self.inbox.get()
+
+    async def publish(self, envelope: SwarmEnvelope) -> None:
+        await self.outbox.put(envelope)
+
+    def take_pending(self) -> List[SwarmEnvelope]:
+        return _take_queued(self.inbox)
+
+    async def close(self) -> None:
+        # Never block here: with a full inbox nobody is waiting in ``receive`` to need waking.
+        with contextlib.suppress(asyncio.QueueFull):
+            self.inbox.put_nowait(None)
+
+
+class UnixSocketTransport(SwarmTransport):
+    """Local stand-in for a real bus: newline-delimited JSON envelopes over a Unix socket.
+
+    Each client connection writes request envelopes and receives the matching
+    responses on the same connection; replies are routed by the request's
+    ``id``, which they carry as ``metadata["request_id"]``. When the inbox is full the server stops
+    reading from sockets, so backpressure reaches producers through the socket.
+    """
+
+    def __init__(self, path: str, maxsize: int = 1024):
+        self.path = path
+        self._inbox: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._routes: Dict[str, asyncio.StreamWriter] = {}
+        self._clients: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(
+            self._serve_client,
+            path=self.path,
+            limit=MAX_ENVELOPE_BYTES,
+        )
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            while line := await reader.readline():
+                try:
+                    envelope = SwarmEnvelope.model_validate_json(line)
+                except ValueError as exc:
+                    # No trustworthy id to correlate with; report the error uncorrelated and keep reading.
+                    await self._send_error(writer, f"Malformed envelope: {exc}")
+                    continue
+                # Keyed by the envelope's own id: requests in one workflow may share a correlation id.
+                self._routes[envelope.id] = writer
+                await self._inbox.put(envelope)
+        except ValueError:
+            # readline() raises ValueError for a line over MAX_ENVELOPE_BYTES. Its request id is
+            # unknown and the stream may be mid-line, so report it uncorrelated and hang up.
+            await self._send_error(writer, f"Envelope exceeds {MAX_ENVELOPE_BYTES} bytes; connection closed.")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            # Replies to a client that has gone away are dropped, so stop tracking its requests.
+            for request_id in [rid for rid, routed in self._routes.items() if routed is writer]:
+                del self._routes[request_id]
+            writer.close()
+
+    @staticmethod
+    async def _send_error(writer: asyncio.StreamWriter, message: str) -> None:
+        error = SwarmEnvelope(
+            type="vision.to_json.error",
+            source_agent="vision_struct_swarm_transport",
+            target_agent="",
+            payload={"success": False, "error": message},
+        )
+        try:
+            writer.write(error.model_dump_json().encode("utf-8") + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def receive(self) -> Optional[SwarmEnvelope]:
+        return await self._inbox.get()
+
+    def take_pending(self) -> List[SwarmEnvelope]:
+        return _take_queued(self._inbox)
+
+    async def publish(self, envelope: SwarmEnvelope) -> None:
+        writer = self._routes.pop(envelope.metadata.get("request_id") or envelope.correlation_id or "", None)
+        if writer is None or writer.is_closing():
+            return
+        writer.write(envelope.model_dump_json().encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        with contextlib.suppress(asyncio.QueueFull):
+            self._inbox.put_nowait(None)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class SwarmWorker:
+    """Pulls envelopes from a transport and answers them with bounded concurrency.
+
+    At most ``max_concurrency`` envelopes are in flight; the worker stops
+    receiving until a slot frees up. ``stop()`` stops intake and lets in-flight
+    envelopes finish (up to ``drain_timeout`` seconds, after which they are
+    cancelled); cancelled envelopes and those still queued in the transport
+    are answered with an error before it is closed. Each response carries ``metadata["timing"]`` with queue and handler
+    durations in milliseconds.
+    """
+
+    def __init__(
+        self,
+        agent: VisionStructAgent,
+        transport: SwarmTransport,
+        max_concurrency: int = 64,
+        envelope_timeout: Optional[float] = None,
+        drain_timeout: float = 30.0,
+    ):
+        self.agent = agent
+        self.transport = transport
+        self.max_concurrency = max_concurrency
+        self.envelope_timeout = envelope_timeout
+        self.drain_timeout = drain_timeout
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._stopping: Optional[asyncio.Event] = None
+        self._tasks: set = set()
+
+    def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self) -> None:
+        self._stopping = asyncio.Event()
+        slots = asyncio.Semaphore(self.max_concurrency)
+        stop_wait = asyncio.ensure_future(self._stopping.wait())
+        try:
+            while not self._stopping.is_set():
+                await slots.acquire()
+                receive = asyncio.ensure_future(self.transport.receive())
+                await asyncio.wait({receive, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if not receive.done():
+                    receive.cancel()
+                    slots.release()
+                    break
+                envelope = receive.result()
+                if envelope is None:
+                    slots.release()
+                    break
+                task = asyncio.ensure_future(self._process(envelope, time.perf_counter()))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            stop_wait.cancel()
+            if self._tasks:
+                _, overdue = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+                for task in overdue:
+                    task.cancel()
+                if overdue:
+                    # Each cancelled ``_process`` answers its envelope before finishing.
+                    await asyncio.wait(overdue)
+            for envelope in self.transport.take_pending():
+                await self._reject(envelope, "Worker is shutting down; envelope was not processed.")
+            await self.transport.close()
+
+    async def _reject(self, envelope: SwarmEnvelope, error: str) -> None:
+        await self.transport.publish(
+            self.agent.swarm_reply(
+                envelope,
+                "vision.to_json.error",
+                {"job_id": envelope.payload.get("job_id"), "success": False, "error": error},
+            ),
+        )
+
+    async def _process(self, envelope: SwarmEnvelope, received_at: float) -> None:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self.agent.ahandle_swarm_message(envelope),
+                timeout=self.envelope_timeout,
+            )
+        except asyncio.CancelledError:
+            await self._reject(envelope, "Worker stopped before the envelope finished (drain timeout).")
+            raise
+        except Exception as exc:  # noqa: BLE001
+            response = self.agent.swarm_reply(
+                envelope,
+                "vision.to_json.error",
+                {
+                    "job_id": envelope.payload.get("job_id"),
+                    "success": False,
+                    "error": str(exc) or type(exc).__name__,
+                },
+            )
+        finished = time.perf_counter()
+
+        self.processed += 1
+        if response.type == "vision.to_json.error":
+            self.failed += 1
+        self.busy_seconds += finished - started
+        response.metadata["timing"] = {
+            "queued_ms": round((started - received_at) * 1000, 3),
+            "handler_ms": round((finished - started) * 1000, 3),
+        }
+        await self.transport.publish(response)
+
+
+async def serve_swarm_socket(agent: VisionStructAgent, path: str, max_concurrency: int = 64) -> None:
+    """Run a ``SwarmWorker`` on a Unix socket until SIGINT/SIGTERM, then drain."""
+    transport = UnixSocketTransport(path)
+    await transport.start()
+    worker = SwarmWorker(agent, transport, max_concurrency=max_concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
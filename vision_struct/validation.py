@@ -0,0 +1,162 @@
+"""Schema validation of model output, compiled from the example in the system prompt."""
+
+from __future__ import annotations
+
+import functools
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from .codec import extract_json_object
+from .prompt import VISION_TO_JSON_SYSTEM_PROMPT
+
+# Path to a value as a linked list of (parent, key); only formatted when reporting an issue.
+_Path = Optional[Tuple[Any, Any]]
+_Check = Callable[[Any, _Path, List[str]], None]
+
+
+class SchemaValidationError(ValueError):
+    """Model output failed strict schema validation; ``issues`` lists every problem found."""
+
+    def __init__(self, issues: List[str]):
+        shown = "; ".join(issues[:5]) + ("; ..." if len(issues) > 5 else "")
+        super().__init__(f"Model output does not match the VisionStruct schema ({len(issues)} issues): {shown}")
+        self.issues = issues
+
+
+class _TooManyIssues(Exception):
+    pass
+
+
+def _format_path(path: _Path) -> str:
+    parts: List[str] = []
+    while path is not None:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "$" + "".join(reversed(parts))
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "string" if isinstance(value, str) else type(value).__name__
+
+
+# Accepted Python types for each JSON scalar type, compared against type(value) directly.
+_SCALAR_TYPES: Dict[str, FrozenSet[type]] = {
+    "string": frozenset({str}),
+    "number": frozenset({int, float}),
+    "boolean": frozenset({bool}),
+}
+_MISSING = object()
+
+
+def _compile(example: Any, max_issues: int) -> Union[_Check, FrozenSet[type]]:
+    """Compile ``example`` into a check closure; scalars compile to their accepted types.
+
+    Scalar fields and scalar array items are checked inline by their parent
+    rather than through a call per value, which is most of the document.
+    """
+
+    def report(issues: List[str], message: str) -> None:
+        issues.append(message)
+        if len(issues) >= max_issues:
+            raise _TooManyIssues
+
+    if isinstance(example, dict):
+        scalars: List[Tuple[str, FrozenSet[type], str]] = []
+        nested: List[Tuple[str, _Check]] = []
+        for key, value in example.items():
+            compiled = _compile(value, max_issues)
+            if isinstance(compiled, frozenset):
+                scalars.append((key, compiled, _type_name(value)))
+            else:
+                nested.append((key, compiled))
+
+        def check_object(value: Any, path: _Path, issues: List[str]) -> None:
+            if value is None:
+                return
+            if not isinstance(value, dict):
+                report(issues, f"{_format_path(path)}: expected object, got {_type_name(value)}")
+                return
+            for key, types, expected in scalars:
+                field = value.get(key, _MISSING)
+                if field is None or type(field) in types:
+                    continue
+                if field is _MISSING:
+                    report(issues, f"{_format_path((path, key))}: missing (use null instead of omitting)")
+                else:
+                    report(issues, f"{_format_path((path, key))}: expected {expected} or null, got {_type_name(field)}")
+            for key, check in nested:
+                if key in value:
+                    check(value[key], (path, key), issues)
+                else:
+                    report(issues, f"{_format_path((path, key))}: missing (use null instead of omitting)")
+
+        return check_object
+
+    if isinstance(example, list):
+        item = _compile(example[0], max_issues) if example else None
+
+        def check_array(value: Any, path: _Path, issues: List[str]) -> None:
+            if value is None:
+                return
+            if not isinstance(value, list):
+                report(issues, f"{_format_path(path)}: expected array, got {_type_name(value)}")
+                return
+            if isinstance(item, frozenset):
+                for index, element in enumerate(value):
+                    if element is not None and type(element) not in item:
+                        expected = _type_name(example[0])
+                        report(issues, f"{_format_path((path, index))}: expected {expected} or null, got {_type_name(element)}")
+            elif item is not None:
+                for index, element in enumerate(value):
+                    item(element, (path, index), issues)
+
+        return check_array
+
+    return _SCALAR_TYPES.get(_type_name(example), frozenset({type(example)}))
+
+
+class VisionSchemaValidator:
+    """One-pass validator compiled from an example document.
+
+    Every key in the example is required (``null`` is allowed, omission is
+    not), containers must keep their shape, array items are checked against
+    the first example item and scalars must keep the example's JSON type.
+    Extra keys are allowed. The example is compiled into nested closures once,
+    so each ``validate`` call is a single walk of the output.
+    """
+
+    def __init__(self, schema: Dict[str, Any], max_issues: int = 50):
+        self.schema = schema
+        self.max_issues = max_issues
+        self._check = _compile(schema, max_issues)
+
+    @classmethod
+    def from_prompt(cls, prompt: str = VISION_TO_JSON_SYSTEM_PROMPT, max_issues: int = 50) -> "VisionSchemaValidator":
+        """Compile the example JSON embedded in a system prompt's output-format section."""
+        marker = prompt.find("OUTPUT FORMAT")
+        schema, _ = extract_json_object(prompt[marker if marker >= 0 else 0:])
+        return cls(schema, max_issues=max_issues)
+
+    def validate(self, document: Any) -> List[str]:
+        """Issues found in ``document`` (empty when valid), capped at ``max_issues``."""
+        issues: List[str] = []
+        if not isinstance(document, dict):
+            return [f"$: expected object, got {_type_name(document)}"]
+        try:
+            self._check(document, None, issues)
+        except _TooManyIssues:
+            issues.append(f"$: stopped after {self.max_issues} issues")
+        return issues
+
+
+@functools.lru_cache(maxsize=None)
+def prompt_schema_validator() -> VisionSchemaValidator:
+    """Process-wide validator for ``VISION_TO_JSON_SYSTEM_PROMPT``, compiled on first use."""
+    return VisionSchemaValidator.from_prompt()